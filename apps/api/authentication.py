@@ -0,0 +1,129 @@
+import copy
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+
+
+class AuthCache:
+    """
+    Short-TTL, process-local map of token / session key -> authenticated
+    user. Entries are dropped by apps.api.signals on logout, token deletion
+    and any change to the user row (password, is_active, is_staff...);
+    other worker processes catch up when the TTL runs out.
+    """
+    def __init__(self, ttl=30, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = {}                  # (kind, key) -> (user, extra, expires)
+        self._by_user = defaultdict(set)    # user id -> {(kind, key), ...}
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, kind, key):
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._drop((kind, key))
+                self.misses += 1
+                return None
+            self.hits += 1
+        user, extra, _ = entry
+        # Each request gets its own copy, views may set attributes on request.user
+        return copy.copy(user), extra
+
+    def set(self, kind, key, user, extra=None):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict()
+            self._entries[(kind, key)] = (user, extra, time.monotonic() + self.ttl)
+            self._by_user[user.pk].add((kind, key))
+
+    def invalidate(self, kind, key):
+        with self._lock:
+            if self._drop((kind, key)):
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for entry_key in list(self._by_user.get(user_id, ())):
+                if self._drop(entry_key):
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+            }
+
+    def _drop(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return False
+        keys = self._by_user.get(entry[0].pk)
+        if keys is not None:
+            keys.discard(entry_key)
+            if not keys:
+                del self._by_user[entry[0].pk]
+        return True
+
+    def _evict(self):
+        now = time.monotonic()
+        for entry_key in [k for k, entry in self._entries.items() if entry[2] < now]:
+            self._drop(entry_key)
+        # Still full: drop the oldest tenth, dicts keep insertion order
+        if len(self._entries) >= self.max_size:
+            for entry_key in list(self._entries)[:max(1, self.max_size // 10)]:
+                self._drop(entry_key)
+
+
+AUTH_CACHE = AuthCache(ttl=getattr(settings, 'API_AUTH_CACHE_TTL', 30))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication without the Token + User query on a cache hit."""
+
+    def authenticate_credentials(self, key):
+        cached = AUTH_CACHE.get('token', key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        AUTH_CACHE.set('token', key, user, token)
+        return user, token
+
+
+class CachedSessionAuthentication(SessionAuthentication):
+    """
+    SessionAuthentication that skips loading the session row and the user
+    on a cache hit. CSRF is still enforced on every unsafe request.
+    """
+
+    def authenticate(self, request):
+        session_key = request._request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if session_key:
+            cached = AUTH_CACHE.get('session', session_key)
+            if cached is not None:
+                user = cached[0]
+                request._request.user = user
+                self.enforce_csrf(request)
+                return user, None
+
+        result = super().authenticate(request)
+        if result is not None and session_key:
+            AUTH_CACHE.set('session', session_key, result[0])
+        return result
@@ -0,0 +1,135 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class BatchView(APIView):
+    """
+    POST /api/batch/ with {"requests": [{"method": "GET", "path": "/api/clients/1/"}, ...]}
+    (or just the list). Each sub-request is dispatched in-process to the API
+    view its path resolves to, as the calling user, and the results come
+    back in order as [{"status": 200, "body": ...}, ...].
+
+    With "parallel": true, consecutive GETs run on a thread pool; any write
+    waits for the reads before it and blocks the ones after it.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_requests = 50
+    max_workers = 4
+    path_prefix = '/api/'
+    allowed_methods = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+    def post(self, request):
+        payload = request.data
+        parallel = False
+        if isinstance(payload, dict):
+            parallel = bool(payload.get('parallel'))
+            payload = payload.get('requests')
+
+        if not isinstance(payload, list) or not payload:
+            return Response({'detail': 'Expected a non-empty list of requests.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > self.max_requests:
+            return Response(
+                {'detail': f'At most {self.max_requests} requests per batch.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        errors = []
+        for index, item in enumerate(payload):
+            error = self.validate_item(item)
+            if error:
+                errors.append({'index': index, 'detail': error})
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(payload)
+        reads = []
+        for index, item in enumerate(payload):
+            if parallel and item.get('method', 'GET').upper() == 'GET':
+                reads.append(index)
+                continue
+            self.run_reads(request, payload, reads, results)
+            reads = []
+            results[index] = self.execute(request, item)
+        self.run_reads(request, payload, reads, results)
+
+        return Response(results)
+
+    def validate_item(self, item):
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return 'Each request needs a "path".'
+        if item.get('method', 'GET').upper() not in self.allowed_methods:
+            return 'Unsupported method.'
+        path = urlsplit(item['path']).path
+        if not path.startswith(self.path_prefix):
+            return f'Path must start with {self.path_prefix}.'
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return 'Not found.'
+        if getattr(match.func, 'view_class', None) is type(self):
+            return 'Batches cannot be nested.'
+        return None
+
+    def run_reads(self, request, payload, indexes, results):
+        if len(indexes) < 2:
+            for index in indexes:
+                results[index] = self.execute(request, payload[index])
+            return
+
+        def work(index):
+            try:
+                return self.execute(request, payload[index])
+            finally:
+                # Pool threads open their own connections, don't leak them
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(indexes))) as pool:
+            for index, result in zip(indexes, pool.map(work, indexes)):
+                results[index] = result
+
+    def execute(self, request, item):
+        method = item.get('method', 'GET').upper()
+        url = urlsplit(item['path'])
+        body = b''
+        if 'body' in item and method != 'GET':
+            body = json.dumps(item['body']).encode()
+
+        environ = {
+            key: value for key, value in request.META.items()
+            if not key.startswith('wsgi.') and key not in ('CONTENT_TYPE', 'CONTENT_LENGTH')
+        }
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': url.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.url_scheme': request.scheme,
+        })
+        sub_request = WSGIRequest(environ)
+        # Reuse the batch's authentication instead of re-running it per item;
+        # CSRF was already checked on the batch request itself
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        sub_request.user = request.user
+
+        match = resolve(url.path)
+        response = match.func(sub_request, *match.args, **match.kwargs)
+
+        if hasattr(response, 'data'):
+            body = response.data
+        else:
+            response = response.render() if hasattr(response, 'render') else response
+            body = response.content.decode() or None
+        return {'status': response.status_code, 'body': body}
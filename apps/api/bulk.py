@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from apps.crm.bulk import bulk_updated
+
+
+class BulkUpsertMixin:
+    """
+    POST <collection>/bulk/ with a list of objects. Each item is matched to
+    an existing row on the viewset's natural key (`upsert_fields`) and
+    becomes an update, otherwise an insert. Every item is validated first;
+    if any fails nothing is written and the errors are reported by index.
+    Writes use bulk_create / bulk_update inside one transaction.
+    """
+    upsert_fields = ()
+    upsert_iexact = ()          # natural key fields compared case-insensitively
+    upsert_max_items = 10000
+    upsert_batch_size = 500
+    upsert_lookup_chunk = 500   # keeps IN (...) lists under backend parameter limits
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Expected a list of objects.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.upsert_max_items:
+            return Response(
+                {'detail': f'At most {self.upsert_max_items} objects per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        errors = []
+        keys = {}
+        for index, item in enumerate(items):
+            key = self.upsert_key(item) if isinstance(item, dict) else None
+            if key is None or None in key:
+                errors.append({'index': index, 'detail': 'Missing natural key: ' + ', '.join(self.upsert_fields)})
+            elif key in keys:
+                errors.append({'index': index, 'detail': f'Duplicate of item {keys[key]}.'})
+            else:
+                keys[key] = index
+
+        existing = self.upsert_existing(list(keys))
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        context = self.get_serializer_context()
+
+        to_create, to_update, update_fields, results = [], [], set(), []
+        for key, index in keys.items():
+            instance = existing.get(key)
+            if instance is not None:
+                try:
+                    self.check_object_permissions(request, instance)
+                except PermissionDenied as exc:
+                    errors.append({'index': index, 'detail': str(exc.detail)})
+                    continue
+
+            serializer = serializer_class(instance=instance, data=items[index], partial=instance is not None, context=context)
+            if not serializer.is_valid():
+                errors.append({'index': index, **serializer.errors})
+                continue
+
+            if instance is None:
+                instance = model(**serializer.validated_data)
+                to_create.append(instance)
+                results.append((index, instance, 'created'))
+            else:
+                for attr, value in serializer.validated_data.items():
+                    setattr(instance, attr, value)
+                    update_fields.add(attr)
+                to_update.append(instance)
+                results.append((index, instance, 'updated'))
+
+        errors.extend(self.upsert_missing_relations(model, results))
+        if errors:
+            errors.sort(key=lambda error: error['index'])
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_update skips auto_now, stamp it so delta sync picks the rows up
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and to_update:
+                for instance in to_update:
+                    setattr(instance, field.attname, field.pre_save(instance, False))
+                update_fields.add(field.name)
+
+        with transaction.atomic():
+            model.objects.bulk_create(to_create, batch_size=self.upsert_batch_size)
+            if to_update and update_fields:
+                model.objects.bulk_update(to_update, list(update_fields), batch_size=self.upsert_batch_size)
+            # bulk_create / bulk_update send no post_save, caches refresh once for the batch
+            bulk_updated.send(sender=model, pks=[instance.pk for instance in to_create + to_update])
+
+        results.sort(key=lambda result: result[0])
+        return Response({
+            'created': len(to_create),
+            'updated': len(to_update),
+            'results': [
+                {'index': index, 'id': instance.pk, 'status': outcome}
+                for index, instance, outcome in results
+            ],
+        })
+
+    def upsert_missing_relations(self, model, results):
+        """
+        The serializers take raw *_id integers, check once per foreign key
+        that the referenced rows exist instead of failing at commit time.
+        """
+        errors = []
+        for field in model._meta.concrete_fields:
+            if not field.many_to_one:
+                continue
+            wanted = {getattr(instance, field.attname) for _, instance, _ in results} - {None}
+            if not wanted:
+                continue
+            found = set()
+            wanted = list(wanted)
+            for start in range(0, len(wanted), self.upsert_lookup_chunk):
+                chunk = wanted[start:start + self.upsert_lookup_chunk]
+                found.update(field.related_model._default_manager.filter(pk__in=chunk).values_list('pk', flat=True))
+            for index, instance, _ in results:
+                value = getattr(instance, field.attname)
+                if value is not None and value not in found:
+                    errors.append({'index': index, field.attname: [f'Invalid pk "{value}" - object does not exist.']})
+        return errors
+
+    def upsert_normalize(self, field, value):
+        if value is None:
+            return None
+        value = str(value).strip()
+        if not value:
+            return None
+        return value.lower() if field in self.upsert_iexact else value
+
+    def upsert_key(self, item):
+        return tuple(self.upsert_normalize(field, item.get(field)) for field in self.upsert_fields)
+
+    def upsert_existing(self, keys):
+        """Map natural key -> existing row, the oldest row wins on duplicates."""
+        model = self.get_serializer_class().Meta.model
+        existing = {}
+        for start in range(0, len(keys), self.upsert_lookup_chunk):
+            chunk = keys[start:start + self.upsert_lookup_chunk]
+            queryset = model.objects.all()
+            for position, field in enumerate(self.upsert_fields):
+                values = {key[position] for key in chunk}
+                if field in self.upsert_iexact:
+                    alias = 'upsert_' + field
+                    queryset = queryset.alias(**{alias: Lower(field)}).filter(**{alias + '__in': values})
+                else:
+                    queryset = queryset.filter(**{field + '__in': values})
+            for instance in queryset.order_by('pk'):
+                key = tuple(self.upsert_normalize(field, getattr(instance, field)) for field in self.upsert_fields)
+                existing.setdefault(key, instance)
+        return existing
@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import urlencode
+from rest_framework import status
+from rest_framework.response import Response
+
+
+GENERATION_PREFIX = 'api:gen:'
+RESPONSE_PREFIX = 'api:resp:'
+
+# Models whose writes invalidate cached API responses
+TRACKED_MODELS = {
+    'auth.user',
+    'clients.client',
+    'clients.clientcontact',
+    'projects.project',
+    'projects.projectrequirement',
+    'payments.payment',
+    'payments.invoice',
+    'crm.clientsegment',
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def generations(labels):
+    """
+    Current generation counter of each model label. Counters start from a
+    timestamp rather than 0 so an evicted counter never comes back with a
+    value an old cache entry was built against.
+    """
+    cache = get_cache()
+    keys = [GENERATION_PREFIX + label for label in labels]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*labels):
+    """Invalidate every cached response built from these models."""
+    cache = get_cache()
+    for label in labels:
+        key = GENERATION_PREFIX + label
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_model(model):
+    label = model._meta.label_lower
+    if label in TRACKED_MODELS:
+        bump(label)
+
+
+def user_scope(user):
+    # Staff see every row, so they share one scope; everyone else is per user
+    return 'staff' if user.is_staff else f'user:{user.pk}'
+
+
+def cache_key(request, labels):
+    params = sorted(
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+    )
+    parts = [
+        user_scope(request.user),
+        request.path,
+        urlencode(params),
+        *map(str, generations(labels)),
+    ]
+    return RESPONSE_PREFIX + hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def cache_response(method):
+    """
+    Serve a GET handler from the response cache. The key covers the user
+    scope, path, sorted query string and the generation counter of every
+    model in `view.cache_models`, so any write to those models makes it
+    unreachable. Also answers If-None-Match with 304.
+    """
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return method(self, request, *args, **kwargs)
+
+        key = cache_key(request, self.cache_models)
+        etag = '"%s"' % key[len(RESPONSE_PREFIX):]
+        cache = get_cache()
+
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+            else:
+                response = method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, self.cache_timeout)
+                response['X-Cache'] = 'MISS'
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        response['Vary'] = 'Accept, Authorization, Cookie'
+        return response
+    return wrapper
+
+
+class CachedResponseMixin:
+    """
+    Per-user response cache for list and retrieve. Set `cache_models` to
+    every model label the rendered responses (including ?expand=) read.
+    Invalidation happens in apps.api.signals; bulk writes that bypass
+    signals call bump() themselves. Across several worker processes
+    CACHES must point at a shared backend.
+    """
+    cache_models = ()
+    cache_timeout = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,153 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def param_tree(value):
+    """
+    Turn a comma separated list of dotted paths into a nested dict.
+    'id,project.title,project.client' -> {'id': {}, 'project': {'title': {}, 'client': {}}}
+    """
+    tree = {}
+    for path in (value or '').split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class ExpandableFieldsMixin:
+    """
+    Sparse fieldsets and expandable relations for model serializers.
+
+    Relations are rendered as primary keys unless listed in ?expand=, in
+    which case the serializer registered in `expandable_fields` is nested.
+    ?fields= limits the readable fields. Both accept dotted paths that are
+    forwarded to the nested serializers, e.g. ?expand=project.client.
+    """
+
+    # field name -> (serializer class name in this module, extra kwargs)
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+        # Only the outermost serializer reads the query string
+        request = self.context.get('request')
+        if request is not None and request.method in SAFE_METHODS:
+            if fields is None:
+                fields = param_tree(request.query_params.get('fields'))
+            if expand is None:
+                expand = param_tree(request.query_params.get('expand'))
+
+        self.apply_fields(fields or {}, expand or {})
+
+    def apply_fields(self, fields, expand):
+        if fields:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    self.fields.pop(name)
+
+        for name, subtree in expand.items():
+            if name not in self.expandable_fields or name not in self.fields:
+                continue
+            serializer_name, options = self.expandable_fields[name]
+            serializer_class = EXPANDABLE_SERIALIZERS[serializer_name]
+            self.fields[name] = serializer_class(
+                read_only=True,
+                fields=fields.get(name, {}),
+                expand=subtree,
+                **options
+            )
+
+
+# Filled by apps.api.serializers, lets expandable_fields refer to classes by name
+EXPANDABLE_SERIALIZERS = {}
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Prune columns and joins to what `serializer` will actually render:
+    expanded FKs are select_related, to-many relations are prefetched (IDs
+    only unless expanded) and, when every rendered field maps to a model
+    column, the SELECT list is reduced with only().
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    plan = {'select': [], 'prefetch': [], 'id_prefetch': [], 'only': [], 'exact': True}
+    _plan(serializer, queryset.model, '', plan, joined=True)
+
+    # A SerializerMethodField may read any column of the related rows, so
+    # they are only narrowed to their IDs when every field is accounted for
+    if plan['exact']:
+        plan['prefetch'] += plan['id_prefetch']
+    else:
+        plan['prefetch'] += [prefetch.prefetch_through for prefetch in plan['id_prefetch']]
+
+    if plan['select']:
+        queryset = queryset.select_related(*plan['select'])
+    if plan['prefetch']:
+        queryset = queryset.prefetch_related(*plan['prefetch'])
+    if plan['exact'] and plan['only']:
+        queryset = queryset.only(*plan['only'])
+    return queryset
+
+
+def _plan(serializer, model, prefix, plan, joined):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        source = getattr(field, 'source_attrs', None) or [field.field_name]
+        if field.source == '*' or len(source) != 1:
+            # SerializerMethodField and friends may touch any attribute
+            plan['exact'] = False
+            continue
+
+        try:
+            model_field = model._meta.get_field(source[0])
+        except FieldDoesNotExist:
+            # Python property, e.g. Payment.remaining_amount
+            plan['exact'] = False
+            continue
+
+        path = prefix + model_field.name
+
+        if not model_field.is_relation:
+            if joined:
+                plan['only'].append(path)
+            continue
+
+        if model_field.many_to_one or (model_field.one_to_one and model_field.concrete):
+            if isinstance(field, serializers.BaseSerializer):
+                if joined:
+                    plan['select'].append(path)
+                    plan['only'].append(path)
+                else:
+                    plan['prefetch'].append(path)
+                _plan(field, model_field.related_model, path + '__', plan, joined)
+            elif joined:
+                plan['only'].append(path)
+            continue
+
+        # Reverse FK, reverse one-to-one or many-to-many
+        if isinstance(field, serializers.Serializer):
+            child = field
+        else:
+            child = getattr(field, 'child', None) or getattr(field, 'child_relation', None)
+        if isinstance(child, serializers.BaseSerializer):
+            plan['prefetch'].append(path)
+            _plan(child, model_field.related_model, path + '__', plan, joined=False)
+        elif not prefix:
+            related = model_field.related_model
+            columns = ['pk']
+            if not model_field.many_to_many:
+                columns.append(model_field.field.attname)
+            plan['id_prefetch'].append(Prefetch(path, queryset=related.objects.only(*columns)))
+        else:
+            plan['prefetch'].append(path)
@@ -0,0 +1,67 @@
+import datetime
+
+import django_filters
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from apps.payments.models import Payment
+from apps.crm.models import PaymentInstallment
+
+
+class UpdatedSinceFilter(BaseFilterBackend):
+    """
+    ?updated_since=<ISO 8601 timestamp or date> keeps only rows changed
+    after that moment. The column comes from `view.updated_since_field`
+    (default `updated_at`), which is indexed on every synced model.
+    """
+    query_param = 'updated_since'
+
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get(self.query_param)
+        if not value:
+            return queryset
+
+        since = self.parse(value)
+        field = getattr(view, 'updated_since_field', 'updated_at')
+        return queryset.filter(**{field + '__gt': since})
+
+    def parse(self, value):
+        try:
+            since = parse_datetime(value)
+            if since is None:
+                day = parse_date(value)
+                if day is not None:
+                    since = datetime.datetime.combine(day, datetime.time.min)
+        except ValueError:
+            since = None
+
+        if since is None:
+            raise ValidationError({self.query_param: 'Expected an ISO 8601 date or timestamp.'})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, datetime.timezone.utc)
+        return since
+
+
+class PaymentFilter(django_filters.FilterSet):
+    """
+    Filters on the PaymentQuerySet annotations, e.g.
+    ?remaining_amount__gte=1000&is_overdue=true. The view's queryset must
+    come from with_overdue().with_remaining().
+    """
+    remaining_amount__gte = django_filters.NumberFilter(field_name='remaining_amount', lookup_expr='gte')
+    remaining_amount__lte = django_filters.NumberFilter(field_name='remaining_amount', lookup_expr='lte')
+    is_overdue = django_filters.BooleanFilter()
+
+    class Meta:
+        model = Payment
+        fields = ['status', 'payment_method', 'client', 'project']
+
+
+class PaymentInstallmentFilter(django_filters.FilterSet):
+    """?is_overdue=true on a PaymentInstallment.objects.with_overdue() queryset"""
+    is_overdue = django_filters.BooleanFilter()
+
+    class Meta:
+        model = PaymentInstallment
+        fields = ['status', 'payment_type', 'project']
@@ -0,0 +1,71 @@
+import datetime
+import io
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from apps.api import renderers
+from apps.api.renderers import FastJSONParser, FastJSONRenderer
+from apps.api.serializers import PaymentSerializer
+from apps.payments.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and fast JSON renderer/parser on PaymentSerializer payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Payments per payload (default: 5000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs, best is reported (default: 5)')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, FastJSONRenderer falls back to the stdlib.'))
+
+        data = PaymentSerializer(self.build_payments(options['rows']), many=True).data
+        body = JSONRenderer().render(data)
+        self.stdout.write(f'Payload: {options["rows"]} payments, {len(body) / 1024:.0f} KiB')
+
+        def best(func):
+            return min(timeit.repeat(func, number=1, repeat=options['repeat'])) * 1000
+
+        rows = [
+            ('render', lambda: JSONRenderer().render(data), lambda: FastJSONRenderer().render(data)),
+            ('parse', lambda: JSONParser().parse(io.BytesIO(body)), lambda: FastJSONParser().parse(io.BytesIO(body))),
+        ]
+        for name, stdlib, fast in rows:
+            stdlib_ms, fast_ms = best(stdlib), best(fast)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{name:<7} stdlib {stdlib_ms:8.1f} ms   fast {fast_ms:8.1f} ms   {stdlib_ms / fast_ms:5.1f}x'
+                )
+            )
+
+    def build_payments(self, count):
+        """Unsaved payments shaped like production rows, nothing touches the database."""
+        now = timezone.now()
+        today = now.date()
+        statuses = [choice for choice, _ in Payment.PAYMENT_STATUS_CHOICES]
+        methods = [choice for choice, _ in Payment.PAYMENT_METHOD_CHOICES]
+        payments = []
+        for i in range(count):
+            amount = Decimal(25000 + (i * 137) % 90000)
+            payments.append(Payment(
+                id=i + 1,
+                project_id=i % 400 + 1,
+                client_id=i % 150 + 1,
+                amount=amount,
+                amount_paid=(amount * (i % 4) / 4).quantize(Decimal('0.01')),
+                payment_date=today - datetime.timedelta(days=i % 365),
+                due_date=today + datetime.timedelta(days=i % 90),
+                status=statuses[i % len(statuses)],
+                payment_method=methods[i % len(methods)],
+                invoice_number=f'INV-{today.year}-{i:06d}',
+                description=f'Milestone {i % 5 + 1} – design, development and deployment',
+                notes='',
+                created_at=now,
+                updated_at=now,
+            ))
+        return payments
@@ -0,0 +1,171 @@
+import base64
+import json
+from collections import namedtuple
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+Cursor = namedtuple('Cursor', ['position', 'reverse'])
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a composite ordering such as
+    ('-created_at', '-id'). Each page is a range scan starting after the
+    last row of the previous one, so there is no COUNT and no OFFSET and
+    the cost of a page does not grow with its depth.
+
+    The ordering comes from `view.cursor_ordering` and always ends with the
+    primary key so ties on the leading column cannot skip or repeat rows.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.fields = [queryset.model._meta.get_field(order.lstrip('-')) for order in self.ordering]
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor.reverse if cursor else False
+        ordering = [self._flip(order) for order in self.ordering] if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        loaded, deferred = queryset.query.deferred_loading
+        if loaded and not deferred:
+            # Keep the cursor columns loaded when only() trimmed the SELECT
+            queryset = queryset.only(*loaded, *[field.name for field in self.fields])
+        if cursor:
+            queryset = queryset.filter(self.after(ordering, cursor.position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (cursor is not None) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, view):
+        ordering = list(getattr(view, 'cursor_ordering', None) or ['-pk'])
+        if ordering[-1].lstrip('-') not in ('pk', 'id'):
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return ['id' if order == 'pk' else '-id' if order == '-pk' else order for order in ordering]
+
+    def after(self, ordering, position):
+        """(a, b, c) > (x, y, z) spelled out so any index on the columns is usable."""
+        condition = Q()
+        for index, order in enumerate(ordering):
+            lookup = '__lt' if order.startswith('-') else '__gt'
+            term = Q(**{order.lstrip('-') + lookup: position[index]})
+            for previous in range(index):
+                term &= Q(**{ordering[previous].lstrip('-'): position[previous]})
+            condition |= term
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(self.position(self.page[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(self.position(self.page[0]), reverse=True))
+
+    def position(self, instance):
+        return [field.value_to_string(instance) for field in self.fields]
+
+    def encode_cursor(self, cursor):
+        payload = json.dumps({'p': cursor.position, 'r': int(cursor.reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            position = [field.to_python(value) for field, value in zip(self.fields, payload['p'])]
+            if len(position) != len(self.fields):
+                raise ValueError
+            return Cursor(position, bool(payload.get('r')))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _flip(order):
+        return order[1:] if order.startswith('-') else '-' + order
+
+
+class CRMPagination(PageNumberPagination):
+    """
+    Page numbers by default. Keyset cursors when the request asks for them
+    (?pagination=cursor, or any ?cursor= link handed out earlier) or when
+    the viewset sets `pagination_mode = 'cursor'`.
+    """
+    pagination_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request, view):
+            self.cursor_paginator = KeysetCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def use_cursor(self, request, view):
+        mode = request.query_params.get(self.pagination_query_param)
+        if mode:
+            return mode == 'cursor'
+        if KeysetCursorPagination.cursor_query_param in request.query_params:
+            return True
+        return getattr(view, 'pagination_mode', 'page') == 'cursor'
@@ -1,81 +1,188 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from apps.clients.models import Client, ClientContact
 from apps.projects.models import Project, ProjectRequirement
 from apps.payments.models import Payment, Invoice
+from apps.crm.models import ClientSegment, DeletionTombstone, PaymentInstallment, ProjectTemplate
+from apps.crm.cadence import CADENCES
+from apps.crm.schedules import MAX_INSTALLMENTS, SPLIT_STRATEGIES
+from .fields import ExpandableFieldsMixin, EXPANDABLE_SERIALIZERS
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff']
         read_only_fields = ['id', 'is_staff']
 
 
-class ClientContactSerializer(serializers.ModelSerializer):
+class ClientContactSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'client': ('ClientSerializer', {}),
+    }
+
     class Meta:
         model = ClientContact
         fields = '__all__'
 
 
-class ClientSerializer(serializers.ModelSerializer):
-    contacts = ClientContactSerializer(many=True, read_only=True)
-    assigned_to = UserSerializer(read_only=True)
+class ClientSegmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClientSegment
+        exclude = ['client']
+
+
+class ClientSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    contacts = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    # Null until compute_client_segments has seen a payment from the client
+    segment = ClientSegmentSerializer(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
-    
+
+    expandable_fields = {
+        'contacts': ('ClientContactSerializer', {'many': True}),
+        'assigned_to': ('UserSerializer', {}),
+    }
+
     class Meta:
         model = Client
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['assigned_to', 'created_at', 'updated_at']
+
 
+class ProjectRequirementSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'project': ('ProjectSerializer', {}),
+    }
 
-class ProjectRequirementSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectRequirement
         fields = '__all__'
 
 
-class ProjectSerializer(serializers.ModelSerializer):
-    project_requirements = ProjectRequirementSerializer(many=True, read_only=True)
-    client = ClientSerializer(read_only=True)
+class ProjectSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    project_requirements = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     client_id = serializers.IntegerField(write_only=True)
-    assigned_to = UserSerializer(read_only=True)
     assigned_to_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
-    
+
+    expandable_fields = {
+        'project_requirements': ('ProjectRequirementSerializer', {'many': True}),
+        'client': ('ClientSerializer', {}),
+        'assigned_to': ('UserSerializer', {}),
+    }
+
     class Meta:
         model = Project
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['client', 'assigned_to', 'created_at', 'updated_at']
 
 
-class PaymentSerializer(serializers.ModelSerializer):
-    project = ProjectSerializer(read_only=True)
+class PaymentSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     project_id = serializers.IntegerField(write_only=True)
-    client = ClientSerializer(read_only=True)
     client_id = serializers.IntegerField(write_only=True)
-    
+    # PaymentQuerySet annotations on reads, the model properties otherwise
+    remaining_amount = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    is_overdue = serializers.BooleanField(read_only=True)
+
+    expandable_fields = {
+        'project': ('ProjectSerializer', {}),
+        'client': ('ClientSerializer', {}),
+    }
+
     class Meta:
         model = Payment
         fields = '__all__'
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['project', 'client', 'created_at', 'updated_at']
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
-    payment = PaymentSerializer(read_only=True)
-    
+class InvoiceSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'payment': ('PaymentSerializer', {}),
+    }
+
     class Meta:
         model = Invoice
         fields = '__all__'
+        read_only_fields = ['payment']
+
+
+class PaymentInstallmentSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    project_id = serializers.IntegerField(write_only=True)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    is_overdue = serializers.BooleanField(read_only=True)
+    days_overdue = serializers.IntegerField(read_only=True)
+    
+    expandable_fields = {
+        'project': ('ProjectSerializer', {}),
+    }
+    
+    class Meta:
+        model = PaymentInstallment
+        fields = '__all__'
+        # Plan occurrences are only created by materialize_recurring_payments.
+        # Read-only also keeps DRF from building a validator out of the
+        # conditional unique_recurring_occurrence constraint, which would make
+        # recurring_plan required; validate() checks that constraint instead.
+        read_only_fields = ['project', 'recurring_plan', 'created_by', 'created_at', 'updated_at']
+    
+    def validate_project_id(self, value):
+        if not Project.objects.filter(pk=value).exists():
+            raise serializers.ValidationError('Project not found.')
+        return value
+    
+    def validate(self, attrs):
+        plan_id = self.instance.recurring_plan_id if self.instance else None
+        due_date = attrs.get('due_date')
+        if plan_id and due_date and (
+            PaymentInstallment.objects.filter(recurring_plan_id=plan_id, due_date=due_date)
+            .exclude(pk=self.instance.pk).exists()
+        ):
+            raise serializers.ValidationError({'due_date': ['This plan already has an installment on this date.']})
+        return attrs
+
+
+class InstallmentScheduleSerializer(serializers.Serializer):
+    """Input for PaymentInstallmentViewSet.schedule, see apps.crm.schedules.plan_schedule"""
+    project_id = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    strategy = serializers.ChoiceField(choices=SPLIT_STRATEGIES)
+    cadence = serializers.ChoiceField(choices=CADENCES, default='monthly')
+    start_date = serializers.DateField()
+    count = serializers.IntegerField(min_value=0, max_value=MAX_INSTALLMENTS, required=False)
+    advance_percent = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    final_percent = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    percentages = serializers.ListField(
+        child=serializers.DecimalField(max_digits=5, decimal_places=2), required=False, max_length=MAX_INSTALLMENTS
+    )
+    title = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    notes = serializers.CharField(required=False, allow_blank=True)
+    preview = serializers.BooleanField(default=False)
+
+
+class ProjectFromTemplateSerializer(serializers.Serializer):
+    """Input for ProjectViewSet.from_template"""
+    template_id = serializers.PrimaryKeyRelatedField(queryset=ProjectTemplate.objects.filter(is_active=True))
+    client_id = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all())
+    title = serializers.CharField(max_length=200)
+    start_date = serializers.DateField()
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    description = serializers.CharField(required=False, allow_blank=True)
 
 
 class ProjectDetailSerializer(ProjectSerializer):
-    payments = PaymentSerializer(many=True, read_only=True)
+    payments = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     total_payments = serializers.SerializerMethodField()
     remaining_budget = serializers.SerializerMethodField()
-    
+
+    expandable_fields = {
+        **ProjectSerializer.expandable_fields,
+        'payments': ('PaymentSerializer', {'many': True}),
+    }
+
     def get_total_payments(self, obj):
         return sum(payment.amount_paid for payment in obj.payments.all())
-    
+
     def get_remaining_budget(self, obj):
         if obj.budget:
             total_paid = sum(payment.amount_paid for payment in obj.payments.all())
@@ -84,12 +191,32 @@ class ProjectDetailSerializer(ProjectSerializer):
 
 
 class ClientDetailSerializer(ClientSerializer):
-    projects = ProjectSerializer(many=True, read_only=True)
+    projects = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     total_projects = serializers.SerializerMethodField()
     active_projects = serializers.SerializerMethodField()
-    
+
+    expandable_fields = {
+        **ClientSerializer.expandable_fields,
+        'projects': ('ProjectSerializer', {'many': True}),
+    }
+
     def get_total_projects(self, obj):
         return obj.projects.count()
-    
+
     def get_active_projects(self, obj):
         return obj.projects.filter(status__in=['planning', 'in_progress']).count()
+
+
+class DeletionTombstoneSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionTombstone
+        fields = ['id', 'model', 'object_id', 'deleted_at']
+
+
+EXPANDABLE_SERIALIZERS.update({
+    serializer.__name__: serializer for serializer in (
+        UserSerializer, ClientContactSerializer, ClientSerializer,
+        ProjectRequirementSerializer, ProjectSerializer,
+        PaymentSerializer, InvoiceSerializer, PaymentInstallmentSerializer,
+    )
+})
@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from apps.crm.bulk import bulk_updated
+from .authentication import AUTH_CACHE
+from .cache import TRACKED_MODELS, bump, bump_model
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_api_cache(sender, update_fields=None, **kwargs):
+    """Bump the model's generation so cached API responses are rebuilt"""
+    label = sender._meta.label_lower
+    if label not in TRACKED_MODELS:
+        return
+    # Logging in only touches last_login, which no API response renders
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    # After commit, or a concurrent read could cache the old rows under the new generation
+    transaction.on_commit(lambda: bump(label))
+
+
+@receiver(bulk_updated)
+def invalidate_api_cache_after_bulk(sender, **kwargs):
+    """One generation bump for a whole queryset.update() batch"""
+    transaction.on_commit(lambda: bump_model(sender))
+
+
+@receiver(user_logged_out)
+def forget_logged_out_session(sender, request, user, **kwargs):
+    """Drop the cached session -> user entry before the session is flushed"""
+    session_key = request.session.session_key
+    if session_key:
+        AUTH_CACHE.invalidate('session', session_key)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    AUTH_CACHE.invalidate('token', instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_changed_user(sender, instance, update_fields=None, **kwargs):
+    """Password changes, deactivation and permission edits re-authenticate"""
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(lambda: AUTH_CACHE.invalidate_user(instance.pk))
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken.views import obtain_auth_token
+from .batch import BatchView
 from .views import (
     UserViewSet, ClientViewSet, ClientContactViewSet,
     ProjectViewSet, ProjectRequirementViewSet,
-    PaymentViewSet, InvoiceViewSet
+    PaymentViewSet, InvoiceViewSet, PaymentInstallmentViewSet, DeletionViewSet,
+    aging_report_view, auth_cache_stats, cash_flow_forecast_view, receivables_cache_stats, receivables_summary
 )
 
 router = DefaultRouter()
@@ -15,8 +17,16 @@ router.register(r'projects', ProjectViewSet)
 router.register(r'project-requirements', ProjectRequirementViewSet)
 router.register(r'payments', PaymentViewSet)
 router.register(r'invoices', InvoiceViewSet)
+router.register(r'installments', PaymentInstallmentViewSet)
+router.register(r'deletions', DeletionViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/token/', obtain_auth_token, name='api_token_auth'),
+    path('auth/cache-stats/', auth_cache_stats, name='api_auth_cache_stats'),
+    path('receivables/', receivables_summary, name='api_receivables'),
+    path('receivables/cache-stats/', receivables_cache_stats, name='api_receivables_cache_stats'),
+    path('reports/aging/', aging_report_view, name='api_aging_report'),
+    path('reports/cash-flow/', cash_flow_forecast_view, name='api_cash_flow_forecast'),
+    path('batch/', BatchView.as_view(), name='api_batch'),
 ]
@@ -1,34 +1,103 @@
-from rest_framework import viewsets, permissions, filters
-from rest_framework.decorators import action
+from decimal import Decimal
+
+from rest_framework import viewsets, permissions, filters, serializers
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import F
+from django.utils import timezone
 from django.contrib.auth.models import User
 from apps.clients.models import Client, ClientContact
 from apps.projects.models import Project, ProjectRequirement
 from apps.payments.models import Payment, Invoice
+from apps.crm.models import DeletionTombstone, PaymentInstallment, ProjectFinancialSummary
+from apps.crm.aging import AGING_BUCKETS, aging_report
+from apps.crm.bulk import BulkActionError, bulk_mark_installments_paid, bulk_update_projects
+from apps.crm.cadence import add_months
+from apps.crm.forecast import cash_flow_forecast
+from apps.crm.ledger import BudgetExceeded, available_budget, create_installment, update_installment
+from apps.crm.project_templates import instantiate_template
+from apps.crm.receivables import OUTSTANDING, RECEIVABLES, STATUS_CODES
+from apps.crm.schedules import build_schedule, create_schedule
+from apps.crm.summaries import ZERO, project_summary
+from .authentication import AUTH_CACHE
+from .bulk import BulkUpsertMixin
+from .cache import CachedResponseMixin, cache_response
+from .filters import PaymentFilter, PaymentInstallmentFilter, UpdatedSinceFilter
+from .fields import optimize_queryset
+from .renderers import CSVRenderer
 from .serializers import (
     UserSerializer, ClientSerializer, ClientDetailSerializer, ClientContactSerializer,
     ProjectSerializer, ProjectDetailSerializer, ProjectRequirementSerializer,
-    PaymentSerializer, InvoiceSerializer
+    PaymentSerializer, InvoiceSerializer, PaymentInstallmentSerializer, InstallmentScheduleSerializer,
+    ProjectFromTemplateSerializer, DeletionTombstoneSerializer
 )
 
 
 class IsOwnerOrStaff(permissions.BasePermission):
     """
     Custom permission to only allow owners of an object or staff members.
+
+    Ownership is the user at the end of `view.owner_lookup`, e.g.
+    'client__assigned_to'. scope() applies it as a queryset filter and
+    selects the owner id alongside each row, so the object check below is
+    a comparison instead of a chain of lazy FK loads.
     """
+    owner_annotation = 'scope_owner_id'
+
+    @classmethod
+    def scope(cls, queryset, request, view):
+        if request.user.is_staff:
+            return queryset
+        return queryset.filter(**{view.owner_lookup: request.user}).annotate(
+            **{cls.owner_annotation: F(view.owner_lookup)}
+        )
+
     def has_object_permission(self, request, view, obj):
         # Staff members can access everything
         if request.user.is_staff:
             return True
         
-        # Check if user is assigned to the object
-        if hasattr(obj, 'assigned_to'):
-            return obj.assigned_to == request.user
-        elif hasattr(obj, 'client') and hasattr(obj.client, 'assigned_to'):
-            return obj.client.assigned_to == request.user
-        
-        return False
+        owner_id = getattr(obj, self.owner_annotation, None)
+        if owner_id is None:
+            # Not loaded through scope(), e.g. matched by a bulk upsert
+            owner_id = self.resolve_owner_id(obj, view.owner_lookup)
+        return owner_id == request.user.pk
+
+    @staticmethod
+    def resolve_owner_id(obj, lookup):
+        *path, field = lookup.split('__')
+        for name in path:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                return None
+        return getattr(obj, obj._meta.get_field(field).attname)
+
+
+class OwnerScopedMixin:
+    """get_queryset() limited to the rows IsOwnerOrStaff lets the user see."""
+    owner_lookup = 'assigned_to'
+
+    def get_queryset(self):
+        return IsOwnerOrStaff.scope(self.queryset.all(), self.request, self)
+
+
+class SparseFieldsMixin:
+    """
+    Honour ?fields= and ?expand= on reads by trimming the queryset to the
+    columns, joins and prefetches the serializer is going to render.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'retrieve'):
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
+
+    def get_related_serializer(self, serializer_class, queryset):
+        serializer = serializer_class(many=True, context=self.get_serializer_context())
+        serializer.instance = optimize_queryset(queryset, serializer)
+        return serializer
 
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
@@ -39,20 +108,38 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['username', 'first_name', 'last_name', 'email']
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(BulkUpsertMixin, CachedResponseMixin, OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'client_type', 'industry', 'assigned_to']
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = {
+        'status': ['exact'],
+        'client_type': ['exact'],
+        'industry': ['exact'],
+        'assigned_to': ['exact'],
+        # ?segment__segment__in=champions,loyal&segment__lifetime_value__gte=100000
+        'segment__segment': ['exact', 'in'],
+        'segment__rfm_score': ['exact', 'gte', 'lte'],
+        'segment__recency_score': ['gte'],
+        'segment__frequency_score': ['gte'],
+        'segment__monetary_score': ['gte'],
+        'segment__lifetime_value': ['gte', 'lte'],
+    }
     search_fields = ['name', 'company_name', 'email', 'phone', 'address']
-    ordering_fields = ['name', 'company_name', 'created_at', 'updated_at']
+    ordering_fields = [
+        'name', 'company_name', 'created_at', 'updated_at',
+        'segment__rfm_score', 'segment__lifetime_value',
+    ]
     ordering = ['-created_at']
-    
-    def get_queryset(self):
-        if self.request.user.is_staff:
-            return Client.objects.all()
-        return Client.objects.filter(assigned_to=self.request.user)
+    cursor_ordering = ['-created_at', '-id']
+    cache_models = (
+        'auth.user', 'clients.client', 'clients.clientcontact',
+        'projects.project', 'projects.projectrequirement', 'payments.payment',
+        'crm.clientsegment',
+    )
+    upsert_fields = ('email',)
+    upsert_iexact = ('email',)
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -60,47 +147,52 @@ class ClientViewSet(viewsets.ModelViewSet):
         return ClientSerializer
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def projects(self, request, pk=None):
         client = self.get_object()
-        projects = client.projects.all()
-        serializer = ProjectSerializer(projects, many=True)
+        serializer = self.get_related_serializer(ProjectSerializer, client.projects.all())
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def payments(self, request, pk=None):
         client = self.get_object()
-        payments = client.payments.all()
-        serializer = PaymentSerializer(payments, many=True)
+        serializer = self.get_related_serializer(PaymentSerializer, client.payments.all())
         return Response(serializer.data)
 
 
-class ClientContactViewSet(viewsets.ModelViewSet):
+class ClientContactViewSet(OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = ClientContact.objects.all()
     serializer_class = ClientContactSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['client', 'is_primary']
-    
-    def get_queryset(self):
-        if self.request.user.is_staff:
-            return ClientContact.objects.all()
-        return ClientContact.objects.filter(client__assigned_to=self.request.user)
+    cursor_ordering = ['-id']
+    owner_lookup = 'client__assigned_to'
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(BulkUpsertMixin, CachedResponseMixin, OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'client', 'assigned_to']
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = {
+        'status': ['exact'],
+        'priority': ['exact'],
+        'client': ['exact'],
+        'assigned_to': ['exact'],
+        # ?requirement_progress__gte=50, maintained column so no COUNT per row
+        'requirement_progress': ['exact', 'gte', 'lte'],
+    }
     search_fields = ['title', 'description', 'client__name']
-    ordering_fields = ['title', 'start_date', 'due_date', 'created_at']
+    ordering_fields = [
+        'title', 'start_date', 'due_date', 'created_at', 'updated_at',
+        'requirement_progress', 'requirements_total', 'requirements_done',
+    ]
     ordering = ['-created_at']
-    
-    def get_queryset(self):
-        if self.request.user.is_staff:
-            return Project.objects.all()
-        return Project.objects.filter(assigned_to=self.request.user)
+    cursor_ordering = ['-created_at', '-id']
+    cache_models = ClientViewSet.cache_models
+    upsert_fields = ('title', 'client_id')
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -108,68 +200,396 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return ProjectSerializer
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def payments(self, request, pk=None):
         project = self.get_object()
-        payments = project.payments.all()
-        serializer = PaymentSerializer(payments, many=True)
+        serializer = self.get_related_serializer(PaymentSerializer, project.payments.all())
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def requirements(self, request, pk=None):
         project = self.get_object()
-        requirements = project.project_requirements.all()
-        serializer = ProjectRequirementSerializer(requirements, many=True)
+        serializer = self.get_related_serializer(ProjectRequirementSerializer, project.project_requirements.all())
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-action')
+    def bulk_action(self, request):
+        """
+        {"ids": [...], "action": "complete" | "status" | "reassign", "value": ...}
+        applied with one UPDATE to the listed projects the user can see.
+        """
+        # A bare JSON array has no .get(), treat it like a missing "ids"
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids or not all(isinstance(pk, int) for pk in ids):
+            return Response({'detail': '"ids" must be a non-empty list of integers.'}, status=400)
+        if len(ids) > self.upsert_max_items:
+            return Response({'detail': f'At most {self.upsert_max_items} ids per request.'}, status=400)
+        
+        try:
+            updated = bulk_update_projects(
+                self.get_queryset().filter(pk__in=ids), request.data.get('action'), request.data.get('value')
+            )
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+        
+        return Response({
+            'updated': len(updated),
+            'not_found': sorted(set(ids) - set(updated)),
+        })
+    
+    @action(detail=False, methods=['post'], url_path='from-template')
+    def from_template(self, request):
+        """
+        {"template_id": 1, "client_id": 2, "title": "...", "start_date": "2024-06-01", "budget": "50000"}
+        creates the project with the template's requirements and installments
+        in one transaction. budget defaults to the template's.
+        """
+        params = ProjectFromTemplateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        client = options.pop('client_id')
+        if not request.user.is_staff and client.assigned_to_id != request.user.pk:
+            return Response({'client_id': ['Client not found.']}, status=400)
+        
+        try:
+            project = instantiate_template(options.pop('template_id'), client, request.user, **options)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+        return Response(ProjectDetailSerializer(project, context=self.get_serializer_context()).data, status=201)
 
 
-class ProjectRequirementViewSet(viewsets.ModelViewSet):
+class ProjectRequirementViewSet(OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = ProjectRequirement.objects.all()
     serializer_class = ProjectRequirementSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['project', 'is_completed']
-    
-    def get_queryset(self):
-        if self.request.user.is_staff:
-            return ProjectRequirement.objects.all()
-        return ProjectRequirement.objects.filter(project__assigned_to=self.request.user)
+    ordering_fields = ['created_at', 'updated_at']
+    cursor_ordering = ['-created_at', '-id']
+    owner_lookup = 'project__assigned_to'
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(CachedResponseMixin, OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'payment_method', 'client', 'project']
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = PaymentFilter
     search_fields = ['invoice_number', 'description', 'project__title', 'client__name']
-    ordering_fields = ['payment_date', 'due_date', 'amount', 'created_at']
+    ordering_fields = ['payment_date', 'due_date', 'amount', 'remaining_amount', 'created_at', 'updated_at']
     ordering = ['-payment_date']
+    cursor_ordering = ['-payment_date', '-id']
+    cache_models = ClientViewSet.cache_models + ('payments.invoice',)
+    owner_lookup = 'project__assigned_to'
     
+    # Annotated per request, with_overdue() compares against today
     def get_queryset(self):
-        if self.request.user.is_staff:
-            return Payment.objects.all()
-        return Payment.objects.filter(project__assigned_to=self.request.user)
+        return super().get_queryset().with_overdue().with_remaining()
     
     @action(detail=True, methods=['get'])
+    @cache_response
     def invoice(self, request, pk=None):
         payment = self.get_object()
         try:
             invoice = payment.invoice
-            serializer = InvoiceSerializer(invoice)
+            serializer = InvoiceSerializer(invoice, context=self.get_serializer_context())
             return Response(serializer.data)
         except Invoice.DoesNotExist:
             return Response({'detail': 'No invoice found for this payment'}, status=404)
 
 
-class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
+class InvoiceViewSet(CachedResponseMixin, OwnerScopedMixin, SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['issue_date', 'due_date']
     search_fields = ['invoice_number']
+    cursor_ordering = ['-issue_date', '-id']
+    cache_models = PaymentViewSet.cache_models
+    owner_lookup = 'payment__project__assigned_to'
+
+
+class PaymentInstallmentViewSet(OwnerScopedMixin, SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = PaymentInstallment.objects.all()
+    serializer_class = PaymentInstallmentSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = PaymentInstallmentFilter
+    search_fields = ['title', 'project__title', 'project__client__name']
+    ordering_fields = ['due_date', 'paid_date', 'amount', 'days_overdue', 'created_at', 'updated_at']
+    ordering = ['-due_date', '-created_at']
+    cursor_ordering = ['-due_date', '-id']
+    owner_lookup = 'project__assigned_to'
+    max_bulk_items = 5000
     
     def get_queryset(self):
-        if self.request.user.is_staff:
-            return Invoice.objects.all()
-        return Invoice.objects.filter(payment__project__assigned_to=self.request.user)
+        return super().get_queryset().with_overdue()
+    
+    def scoped_projects(self):
+        # Installments can only be put on projects the caller may see
+        projects = Project.objects.all()
+        if not self.request.user.is_staff:
+            projects = projects.filter(assigned_to=self.request.user)
+        return projects
+    
+    def check_project(self, project_id):
+        if not self.scoped_projects().filter(pk=project_id).exists():
+            raise serializers.ValidationError({'project_id': ['Project not found.']})
+    
+    # Writes go through the ledger so the budget check holds the project lock
+    def perform_create(self, serializer):
+        data = dict(serializer.validated_data)
+        self.check_project(data['project_id'])
+        try:
+            serializer.instance = create_installment(
+                data.pop('project_id'), amount=data.pop('amount'), created_by=self.request.user, **data
+            )
+        except ProjectFinancialSummary.DoesNotExist:
+            raise serializers.ValidationError({'project_id': ['Project not found.']})
+        except ValueError as e:
+            # BudgetExceeded, or an amount parse_amount rejects
+            raise serializers.ValidationError({'amount': [str(e)]})
+    
+    def perform_update(self, serializer):
+        data = dict(serializer.validated_data)
+        if 'project_id' in data:
+            self.check_project(data['project_id'])
+        try:
+            update_installment(serializer.instance, amount=data.pop('amount', serializer.instance.amount), **data)
+        except ProjectFinancialSummary.DoesNotExist:
+            raise serializers.ValidationError({'project_id': ['Project not found.']})
+        except ValueError as e:
+            raise serializers.ValidationError({'amount': [str(e)]})
+    
+    @action(detail=False, methods=['post'], url_path='mark-paid')
+    def mark_paid(self, request):
+        """
+        {"items": [{"id": 1, "paid_date": "2024-05-02"}, ...], "paid_date": "..."}
+        The top-level paid_date (default today) applies to items without one.
+        All items are validated first; nothing is written if any fails.
+        """
+        # A bare JSON array has no .get(), treat it like a missing "items"
+        items = request.data.get('items') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'detail': '"items" must be a non-empty list.'}, status=400)
+        if len(items) > self.max_bulk_items:
+            return Response({'detail': f'At most {self.max_bulk_items} items per request.'}, status=400)
+        
+        date_field = serializers.DateField()
+        try:
+            default_date = date_field.run_validation(request.data.get('paid_date') or timezone.now().date())
+        except serializers.ValidationError as e:
+            return Response({'paid_date': e.detail}, status=400)
+        
+        paid_dates, errors = {}, []
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if not isinstance(pk, int):
+                errors.append({'index': index, 'detail': '"id" must be an integer.'})
+                continue
+            if pk in paid_dates:
+                errors.append({'index': index, 'detail': f'Duplicate id {pk}.'})
+                continue
+            try:
+                paid_dates[pk] = date_field.run_validation(item.get('paid_date') or default_date)
+            except serializers.ValidationError as e:
+                errors.append({'index': index, 'paid_date': e.detail})
+        if errors:
+            return Response({'errors': errors}, status=400)
+        
+        try:
+            updated = bulk_mark_installments_paid(self.get_queryset(), paid_dates)
+        except BulkActionError as e:
+            return Response({'errors': e.errors}, status=400)
+        return Response({'updated': len(updated)})
+    
+    @action(detail=False, methods=['post'])
+    def schedule(self, request):
+        """
+        Generate a whole payment plan for a project in one call:
+        {"project_id": 1, "total": "240000", "strategy": "equal", "count": 24,
+         "cadence": "monthly", "start_date": "2024-06-01"}
+        strategy "milestones" takes advance_percent/final_percent and count
+        milestones in between; "percentages" takes a list that sums to 100.
+        With "preview": true nothing is saved and the series is returned.
+        """
+        params = InstallmentScheduleSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        preview = options.pop('preview')
+        
+        projects = self.scoped_projects().select_related('financial_summary')
+        project = projects.filter(pk=options.pop('project_id')).first()
+        if project is None:
+            return Response({'project_id': ['Project not found.']}, status=400)
+        
+        try:
+            installments = build_schedule(project, request.user, **options)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=400)
+        
+        if preview:
+            total = sum(installment.amount for installment in installments)
+            available = available_budget(project_summary(project))
+            return Response({
+                'total': total,
+                'available_budget': available,
+                'within_budget': total <= available,
+                'results': PaymentInstallmentSerializer(installments, many=True).data,
+            })
+        
+        try:
+            created = create_schedule(installments)
+        except BudgetExceeded as e:
+            return Response({'total': [str(e)]}, status=400)
+        return Response(
+            {'created': len(created), 'results': PaymentInstallmentSerializer(created, many=True).data},
+            status=201
+        )
+
+
+class DeletionViewSet(OwnerScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Tombstones for deleted clients, projects, requirements and payments.
+    Pair with ?updated_since= on the collections to sync incrementally.
+    """
+    queryset = DeletionTombstone.objects.all()
+    serializer_class = DeletionTombstoneSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [UpdatedSinceFilter, DjangoFilterBackend]
+    filterset_fields = ['model']
+    updated_since_field = 'deleted_at'
+    cursor_ordering = ['-deleted_at', '-id']
+    owner_lookup = 'owner'
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def auth_cache_stats(request):
+    """Hit, miss and invalidation counters of this worker's auth cache."""
+    return Response(AUTH_CACHE.stats())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def receivables_summary(request):
+    """
+    Installment totals, monthly paid/due buckets for the last ?months=
+    (default 12) and per-project totals, answered from this worker's
+    receivables snapshot. Non-staff users see their own projects only.
+    """
+    try:
+        months = min(max(int(request.query_params.get('months', 12)), 1), 120)
+    except ValueError:
+        return Response({'months': ['Expected an integer.']}, status=400)
+    
+    projects = None
+    if not request.user.is_staff:
+        projects = set(Project.objects.filter(assigned_to=request.user).values_list('pk', flat=True))
+    
+    today = timezone.now().date()
+    start = add_months(today.replace(day=1), 1 - months)
+    paid = RECEIVABLES.monthly(start, today, projects=projects)
+    due = RECEIVABLES.monthly(start, today, by='due', projects=projects)
+    billed = RECEIVABLES.by_project(projects=projects)
+    collected = RECEIVABLES.by_project(statuses={STATUS_CODES['paid']}, projects=projects)
+    outstanding = RECEIVABLES.by_project(statuses=OUTSTANDING, projects=projects)
+    # Decimals as strings, like the serializers' DecimalFields
+    return Response({
+        'totals': {
+            key: str(value) if isinstance(value, Decimal) else value
+            for key, value in RECEIVABLES.totals(today, projects=projects).items()
+        },
+        'monthly': [
+            {'month': month, 'paid': str(paid_total), 'due': str(due_total)}
+            for (month, paid_total), (_, due_total) in zip(paid, due)
+        ],
+        'projects': [
+            {
+                'project': pk,
+                'billed': str(total),
+                'paid': str(collected.get(pk, ZERO)),
+                'outstanding': str(outstanding.get(pk, ZERO)),
+            }
+            for pk, total in sorted(billed.items())
+        ],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def receivables_cache_stats(request):
+    """Size, cursor and refresh counters of this worker's receivables snapshot."""
+    return Response(RECEIVABLES.stats())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [CSVRenderer])
+def aging_report_view(request):
+    """
+    Accounts-receivable aging of open installments and payments, one row
+    per project (?group=client for one per client). ?format=csv downloads
+    the rows plus a totals line. Non-staff users see their own projects.
+    """
+    group = request.query_params.get('group', 'project')
+    if group not in ('project', 'client'):
+        return Response({'group': ['Expected "project" or "client".']}, status=400)
+    
+    project_ids = None
+    if not request.user.is_staff:
+        project_ids = Project.objects.filter(assigned_to=request.user).values_list('pk', flat=True)
+    report = aging_report(project_ids=project_ids)
+    rows = report['clients' if group == 'client' else 'projects']
+    
+    if request.accepted_renderer.format == 'csv':
+        filename = f'ar-aging-{group}-{report["as_of"].isoformat()}.csv'
+        return Response(
+            rows + [{'client_name': 'Total', **report['totals']}],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
+    
+    def money(row):
+        return {key: str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+    
+    return Response({
+        'as_of': report['as_of'],
+        'group': group,
+        'buckets': [{'key': key, 'label': label} for key, label, _, _ in AGING_BUCKETS],
+        'results': [money(row) for row in rows],
+        'totals': money(report['totals']),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [CSVRenderer])
+def cash_flow_forecast_view(request):
+    """
+    Expected weekly inflows for the next ?months= (default 3, at most 24)
+    with an 80% band, see apps.crm.forecast. ?format=csv downloads the
+    weekly rows. Non-staff users see their own projects.
+    """
+    try:
+        months = min(max(int(request.query_params.get('months', 3)), 1), 24)
+    except ValueError:
+        return Response({'months': ['Expected an integer.']}, status=400)
+    
+    projects = None
+    if not request.user.is_staff:
+        projects = set(Project.objects.filter(assigned_to=request.user).values_list('pk', flat=True))
+    forecast = cash_flow_forecast(months, projects=projects)
+    
+    if request.accepted_renderer.format == 'csv':
+        filename = f'cash-flow-{forecast["start"].isoformat()}-{months}m.csv'
+        return Response(forecast['weeks'], headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+    
+    def money(row):
+        return {key: str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+    
+    return Response({
+        **money({key: value for key, value in forecast.items() if key != 'weeks'}),
+        'weeks': [money(row) for row in forecast['weeks']],
+    })
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['updated_at'], name='clients_cli_updated_ee37e2_idx'),
+        ),
+    ]
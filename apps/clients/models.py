@@ -52,6 +52,12 @@ class Client(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['created_at', 'id']),
+            # Delta sync: ?updated_since=
+            models.Index(fields=['updated_at']),
+        ]
 
 
 class ClientContact(models.Model):
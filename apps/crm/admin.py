@@ -3,7 +3,10 @@ from django.contrib.admin import SimpleListFilter
 from django.conf import settings
 from apps.clients.models import Client, ClientContact
 from apps.projects.models import Project, ProjectRequirement
-from .models import CustomSMTPConfig, EmailLog
+from .models import (
+    CustomSMTPConfig, EmailLog, DeletionTombstone, ProjectFinancialSummary, ClientFinancialSummary, ClientSegment,
+    RecurringPaymentPlan, ProjectTemplate, ProjectTemplateRequirement
+)
 
 
 # Note: Client, Project, and ProjectRequirement models are already registered 
@@ -57,6 +60,85 @@ class EmailLogAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(DeletionTombstone)
+class DeletionTombstoneAdmin(admin.ModelAdmin):
+    list_display = ['model', 'object_id', 'owner', 'deleted_at']
+    list_filter = ['model', 'deleted_at']
+    search_fields = ['object_id']
+    readonly_fields = ['model', 'object_id', 'owner', 'deleted_at']
+
+
+@admin.register(ProjectFinancialSummary)
+class ProjectFinancialSummaryAdmin(admin.ModelAdmin):
+    list_display = ['project', 'total_billed', 'total_paid', 'total_pending', 'total_overdue', 'remaining_budget', 'updated_at']
+    search_fields = ['project__title']
+    readonly_fields = ['project', 'total_billed', 'total_paid', 'total_pending', 'total_overdue', 'remaining_budget', 'updated_at']
+
+
+@admin.register(ClientFinancialSummary)
+class ClientFinancialSummaryAdmin(admin.ModelAdmin):
+    list_display = ['client', 'total_billed', 'total_paid', 'total_pending', 'total_overdue', 'remaining_budget', 'updated_at']
+    search_fields = ['client__name']
+    readonly_fields = ['client', 'total_billed', 'total_paid', 'total_pending', 'total_overdue', 'remaining_budget', 'updated_at']
+
+
+@admin.register(ClientSegment)
+class ClientSegmentAdmin(admin.ModelAdmin):
+    list_display = ['client', 'segment', 'rfm_score', 'recency_days', 'frequency', 'monetary', 'lifetime_value', 'computed_at']
+    list_filter = ['segment', 'rfm_score']
+    search_fields = ['client__name']
+    readonly_fields = [
+        'client', 'recency_days', 'frequency', 'monetary', 'first_paid', 'last_paid', 'recency_score',
+        'frequency_score', 'monetary_score', 'rfm_score', 'lifetime_value', 'segment', 'computed_at'
+    ]
+
+
+@admin.register(RecurringPaymentPlan)
+class RecurringPaymentPlanAdmin(admin.ModelAdmin):
+    list_display = ['title', 'project', 'amount', 'cadence', 'start_date', 'end_date', 'materialized_through', 'is_active']
+    list_filter = ['cadence', 'is_active', 'payment_type']
+    search_fields = ['title', 'project__title', 'project__client__name']
+    list_editable = ['is_active']
+    readonly_fields = ['materialized_through', 'created_by', 'created_at', 'updated_at']
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+class ProjectTemplateRequirementInline(admin.TabularInline):
+    model = ProjectTemplateRequirement
+    extra = 3
+
+
+@admin.register(ProjectTemplate)
+class ProjectTemplateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'default_budget', 'duration_days', 'split_strategy', 'cadence', 'is_active']
+    list_filter = ['split_strategy', 'is_active']
+    search_fields = ['name', 'description']
+    readonly_fields = ['created_by', 'created_at', 'updated_at']
+    inlines = [ProjectTemplateRequirementInline]
+    
+    fieldsets = (
+        ('Project Defaults', {
+            'fields': ('name', 'description', 'default_budget', 'duration_days', 'priority', 'is_active')
+        }),
+        ('Installment Split', {
+            'fields': ('split_strategy', 'installment_count', 'cadence', 'advance_percent', 'final_percent', 'percentages')
+        }),
+        ('Metadata', {
+            'fields': ('created_by', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
 # Simple email configuration display (no registration needed)
 class EmailConfigInfo:
     """Display email configuration information in admin"""
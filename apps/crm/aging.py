@@ -0,0 +1,139 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.utils import timezone
+from apps.payments.models import Payment
+from .models import PaymentInstallment
+
+
+ZERO = Decimal('0.00')
+GENERATION_KEY = 'crm:aging:gen'
+
+# (key, label, fewest days past due, most days past due)
+AGING_BUCKETS = [
+    ('current', 'Current', None, 0),
+    ('days_1_30', '1-30 days', 1, 30),
+    ('days_31_60', '31-60 days', 31, 60),
+    ('days_61_90', '61-90 days', 61, 90),
+    ('days_90_plus', '90+ days', 91, None),
+]
+BUCKET_KEYS = [key for key, _, _, _ in AGING_BUCKETS]
+AMOUNT_KEYS = BUCKET_KEYS + ['total']
+
+
+def _bucket_sums(today, amount):
+    """One conditional Sum per bucket, on how many days before `today` due_date was"""
+    output = DecimalField(max_digits=14, decimal_places=2)
+    sums = {}
+    for key, _, low, high in AGING_BUCKETS:
+        condition = Q()
+        if low is not None:
+            condition &= Q(due_date__lte=today - timedelta(days=low))
+        if high is not None:
+            condition &= Q(due_date__gte=today - timedelta(days=high))
+        sums[key] = Sum(Case(When(condition, then=amount), default=Value(ZERO), output_field=output))
+    sums['total'] = Sum(amount, output_field=output)
+    return sums
+
+
+def aging_rows(today):
+    """
+    Open amounts per project in each aging bucket: unpaid installments and
+    the unpaid part of open payments, grouped with Case/When sums and
+    combined with UNION ALL, so a single query.
+    """
+    installments = (
+        PaymentInstallment.objects.filter(status__in=['pending', 'overdue'])
+        .values(
+            'project_id',
+            client_id=F('project__client_id'),
+            project_title=F('project__title'),
+            client_name=F('project__client__name'),
+        )
+        .annotate(**_bucket_sums(today, F('amount')))
+        .order_by()
+    )
+    payments = (
+        Payment.objects.exclude(status__in=['completed', 'cancelled'])
+        .filter(amount__gt=F('amount_paid'))
+        .values(
+            'project_id',
+            'client_id',
+            project_title=F('project__title'),
+            client_name=F('client__name'),
+        )
+        .annotate(**_bucket_sums(today, F('amount') - F('amount_paid')))
+        .order_by()
+    )
+
+    # A project with both open installments and open payments comes back twice
+    projects = {}
+    for row in installments.union(payments, all=True):
+        key = (row['client_id'], row['project_id'])
+        if key in projects:
+            for name in AMOUNT_KEYS:
+                projects[key][name] += row[name]
+        else:
+            projects[key] = row
+    for row in projects.values():
+        for name in AMOUNT_KEYS:
+            row[name] = (row[name] or ZERO).quantize(ZERO)
+    return sorted(projects.values(), key=lambda row: (row['client_name'], row['project_title'], row['project_id']))
+
+
+def summarize(project_rows, today):
+    """The report for these project rows: the rows, per-client rollups and grand totals"""
+    clients = {}
+    totals = dict.fromkeys(AMOUNT_KEYS, ZERO)
+    for row in project_rows:
+        client = clients.setdefault(row['client_id'], {
+            'client_id': row['client_id'],
+            'client_name': row['client_name'],
+            'projects': 0,
+            **dict.fromkeys(AMOUNT_KEYS, ZERO),
+        })
+        client['projects'] += 1
+        for name in AMOUNT_KEYS:
+            client[name] += row[name]
+            totals[name] += row[name]
+    return {
+        'as_of': today,
+        'projects': project_rows,
+        'clients': sorted(clients.values(), key=lambda row: (row['client_name'], row['client_id'])),
+        'totals': totals,
+    }
+
+
+def aging_report(today=None, project_ids=None):
+    """
+    The AR aging report as of today, cached until an installment, payment
+    or project changes (or AR_AGING_CACHE_TIMEOUT runs out). Pass
+    `project_ids` to limit it to those projects.
+    """
+    today = today or timezone.now().date()
+    key = f'crm:aging:{_generation()}:{today.isoformat()}'
+    project_rows = cache.get(key)
+    if project_rows is None:
+        project_rows = aging_rows(today)
+        cache.set(key, project_rows, getattr(settings, 'AR_AGING_CACHE_TIMEOUT', 600))
+    if project_ids is not None:
+        project_ids = set(project_ids)
+        project_rows = [row for row in project_rows if row['project_id'] in project_ids]
+    return summarize(project_rows, today)
+
+
+def invalidate_aging():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def _generation():
+    # Starts from a timestamp so an evicted counter never reuses an old value
+    cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    return cache.get(GENERATION_KEY)
@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from apps.projects.models import Project
+from .models import PaymentInstallment
+
+
+# Sent once per set-based write (update()/bulk_create() send no post_save),
+# inside its transaction, with sender=<model class> and pks=<affected ids>.
+# Writers that know them also pass project_ids=<parent project ids>: after
+# bulk_create, pks are None on backends that can't return inserted rows
+bulk_updated = Signal()
+
+
+class BulkActionError(ValueError):
+    """Validation failed for some rows; `errors` is [{'id': ..., 'detail': ...}]"""
+    def __init__(self, errors):
+        super().__init__('; '.join(f"#{error['id']}: {error['detail']}" for error in errors))
+        self.errors = errors
+
+
+PROJECT_BULK_ACTIONS = [
+    ('complete', 'Mark as completed'),
+    ('status', 'Change status'),
+    ('reassign', 'Reassign'),
+]
+
+
+def bulk_update_projects(projects, action, value=None):
+    """
+    Complete, re-status or reassign every project in the queryset with one
+    UPDATE. Returns the list of affected ids; raises ValueError on bad input.
+    """
+    if action == 'complete':
+        changes = {'status': 'completed'}
+    elif action == 'status':
+        if value not in dict(Project.STATUS_CHOICES):
+            raise ValueError(f'Unknown status "{value}".')
+        changes = {'status': value}
+    elif action == 'reassign':
+        if value in (None, ''):
+            changes = {'assigned_to': None}
+        elif User.objects.filter(pk=value, is_active=True).exists():
+            changes = {'assigned_to_id': value}
+        else:
+            raise ValueError('Unknown or inactive user.')
+    else:
+        raise ValueError(f'Unknown action "{action}".')
+
+    with transaction.atomic():
+        ids = list(projects.select_for_update().values_list('pk', flat=True))
+        if ids:
+            # update() skips auto_now, set it so delta sync sees the change
+            Project.objects.filter(pk__in=ids).update(updated_at=timezone.now(), **changes)
+            bulk_updated.send(sender=Project, pks=ids)
+    return ids
+
+
+def bulk_mark_installments_paid(installments, paid_dates):
+    """
+    Mark installments paid. `paid_dates` maps installment id -> paid date.
+    Every id is checked with one query against `installments` (so callers
+    pass their scoped queryset) and nothing is written unless all pass;
+    then one UPDATE runs per distinct paid date. Returns the updated ids.
+    """
+    today = timezone.now().date()
+    rows = dict(installments.filter(pk__in=list(paid_dates)).values_list('pk', 'status'))
+
+    errors = []
+    for pk, paid_date in paid_dates.items():
+        if pk not in rows:
+            errors.append({'id': pk, 'detail': 'Not found.'})
+        elif rows[pk] in ('paid', 'cancelled'):
+            errors.append({'id': pk, 'detail': f'Installment is already {rows[pk]}.'})
+        elif paid_date > today:
+            errors.append({'id': pk, 'detail': 'Paid date cannot be in the future.'})
+    if errors:
+        raise BulkActionError(errors)
+
+    by_date = {}
+    for pk, paid_date in paid_dates.items():
+        by_date.setdefault(paid_date, []).append(pk)
+
+    ids = list(paid_dates)
+    now = timezone.now()
+    with transaction.atomic():
+        for paid_date, pks in by_date.items():
+            # The status filter keeps a concurrent mark-paid from being applied twice
+            PaymentInstallment.objects.filter(pk__in=pks).exclude(status__in=['paid', 'cancelled']).update(
+                status='paid', paid_date=paid_date, updated_at=now
+            )
+        bulk_updated.send(sender=PaymentInstallment, pks=ids)
+    return ids
@@ -0,0 +1,49 @@
+import calendar
+from datetime import timedelta
+
+
+CADENCES = [
+    ('weekly', 'Weekly'),
+    ('biweekly', 'Every two weeks'),
+    ('monthly', 'Monthly'),
+    ('quarterly', 'Quarterly'),
+]
+
+# Longest possible gap between two dates of each cadence, in days
+MAX_STEP_DAYS = {'weekly': 7, 'biweekly': 14, 'monthly': 31, 'quarterly': 92}
+
+
+def add_months(day, months):
+    """Same day `months` later, clamped to the end of shorter months"""
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_date(start_date, cadence, index):
+    """The index-th date (0 = start_date); always offset from the start so month ends don't drift"""
+    if cadence == 'weekly':
+        return start_date + timedelta(weeks=index)
+    if cadence == 'biweekly':
+        return start_date + timedelta(weeks=2 * index)
+    if cadence == 'monthly':
+        return add_months(start_date, index)
+    if cadence == 'quarterly':
+        return add_months(start_date, 3 * index)
+    raise ValueError(f'Unknown cadence "{cadence}".')
+
+
+def due_dates(start_date, cadence, count):
+    """The first `count` dates of the cadence"""
+    return [nth_date(start_date, cadence, index) for index in range(count)]
+
+
+def first_index_on_or_after(start_date, cadence, day):
+    """Index of the first date of the cadence that is not before `day`"""
+    if day <= start_date:
+        return 0
+    # Each step is at most MAX_STEP_DAYS long, so this never overshoots
+    index = (day - start_date).days // MAX_STEP_DAYS[cadence]
+    while nth_date(start_date, cadence, index) < day:
+        index += 1
+    return index
@@ -0,0 +1,177 @@
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F
+from django.utils import timezone
+from apps.projects.models import Project
+from .cadence import add_months
+from .models import RecurringPaymentPlan
+from .receivables import OUTSTANDING, RECEIVABLES, STATUS_CODES
+from .recurring import upcoming_occurrences
+
+
+# A client's own payment delays are used once they have this many paid installments
+MIN_HISTORY = 5
+# Half-width of the confidence band in standard deviations (80% two-sided)
+BAND_Z = 1.2816
+SOURCES = ('installments', 'recurring', 'unscheduled')
+ACTIVE_PROJECT_STATUSES = ['planning', 'in_progress', 'on_hold']
+CENT = Decimal('0.01')
+
+
+class DelayDistribution:
+    """Empirical distribution of paid_date - due_date in days"""
+
+    def __init__(self, delays):
+        counts = Counter(delays)
+        self.delays = sorted(counts)
+        self.counts = [counts[delay] for delay in self.delays]
+        self.patterns = {}
+
+    def weeks(self, due, today, start):
+        """
+        (week index, [(weeks after it, probability), ...]) for an unpaid
+        installment due on ordinal `due`: delays that would already have
+        been paid before today are ruled out and the rest renormalised.
+        Weeks count from `start`. None when it is already later than any
+        payment seen before.
+        """
+        first = bisect_left(self.delays, today - due)
+        week, weekday = divmod(due - start, 7)
+        # Dues a whole number of weeks apart with the same delays ruled out
+        # land in the same pattern of weeks, shifted
+        key = (first, weekday)
+        pattern = self.patterns.get(key)
+        if pattern is None:
+            pattern = self.patterns[key] = self.pattern(first, weekday)
+        return (week, pattern) if pattern else None
+
+    def pattern(self, first, weekday):
+        remaining = sum(self.counts[first:])
+        weeks = defaultdict(int)
+        for delay, count in zip(self.delays[first:], self.counts[first:]):
+            weeks[(weekday + delay) // 7] += count
+        return [(week, count / remaining) for week, count in weeks.items()]
+
+
+def delay_distributions():
+    """
+    ({client id: DelayDistribution}, pooled DelayDistribution) from every
+    paid installment with a paid date. Clients with fewer than MIN_HISTORY
+    payments fall back to the pooled one.
+    """
+    client, due, paid = RECEIVABLES.select(['client', 'due', 'paid'], statuses={STATUS_CODES['paid']})
+    by_client = defaultdict(list)
+    for client_id, due_date, paid_date in zip(client, due, paid):
+        if paid_date:
+            by_client[client_id].append(paid_date - due_date)
+    pooled = DelayDistribution([delay for delays in by_client.values() for delay in delays] or [0])
+    return {
+        client_id: DelayDistribution(delays)
+        for client_id, delays in by_client.items() if len(delays) >= MIN_HISTORY
+    }, pooled
+
+
+def expected_receipts(today, end, projects=None):
+    """
+    Yield (source, amount, due ordinal, client id) for money not received
+    yet: open installments (from the receivables snapshot), recurring plan
+    occurrences up to `end` that aren't stored yet, and the part of active
+    projects' budgets no installment covers, expected on the project's due
+    date. Projects with an active recurring plan have no unscheduled part.
+    """
+    amount, due, client = RECEIVABLES.select(['amount', 'due', 'client'], statuses=OUTSTANDING, projects=projects)
+    for paise, due_date, client_id in zip(amount, due, client):
+        yield 'installments', paise / 100, due_date, client_id
+
+    plans = RecurringPaymentPlan.objects.filter(is_active=True).select_related('project')
+    if projects is not None:
+        plans = plans.filter(project__in=projects)
+    plans = list(plans)
+    for installment in upcoming_occurrences(end=end, plans=plans):
+        yield 'recurring', float(installment.amount), installment.due_date.toordinal(), installment.project.client_id
+
+    unscheduled = (
+        Project.objects.filter(status__in=ACTIVE_PROJECT_STATUSES, budget__gt=F('financial_summary__total_billed'))
+        .exclude(pk__in=[plan.project_id for plan in plans])
+        .values_list('budget', 'financial_summary__total_billed', 'due_date', 'client_id')
+        .order_by()
+    )
+    if projects is not None:
+        unscheduled = unscheduled.filter(pk__in=projects)
+    for budget, billed, due_date, client_id in unscheduled:
+        yield 'unscheduled', float(budget - billed), max(due_date, today).toordinal(), client_id
+
+
+def cash_flow_forecast(months=3, today=None, projects=None):
+    """
+    Expected weekly inflows from today to `months` ahead, with an 80%
+    band. Each receipt's amount is spread over the weeks its client's
+    past delays put it in (treating receipts as independent for the
+    variance). Receipts already later than every past payment are only
+    totalled, as overdue_beyond_history. `projects` limits the forecast
+    to those projects.
+    """
+    today = today or timezone.now().date()
+    start = today - timedelta(days=today.weekday())
+    end = add_months(today, months)
+    week_count = (end - start).days // 7 + 1
+    today_ord, start_ord = today.toordinal(), start.toordinal()
+
+    by_client, pooled = delay_distributions()
+    expected = {source: array('d', [0.0]) * week_count for source in SOURCES}
+    variance = array('d', [0.0]) * week_count
+    beyond = stale = 0.0
+
+    # Receipts sharing a distribution and due date share their weeks: sum
+    # the amounts (and squares, for the variance) before spreading them
+    groups = defaultdict(lambda: [0.0, 0.0])
+    for source, amount, due, client_id in expected_receipts(today, end, projects):
+        group = groups[source, by_client.get(client_id, pooled), due]
+        group[0] += amount
+        group[1] += amount * amount
+
+    for (source, distribution, due), (amount, square) in groups.items():
+        weeks = distribution.weeks(due, today_ord, start_ord)
+        if weeks is None:
+            # History gives no date for these, leave them out of the weekly figures
+            stale += amount
+            continue
+        first, pattern = weeks
+        series = expected[source]
+        for offset, probability in pattern:
+            week = first + offset
+            if week < week_count:
+                series[week] += amount * probability
+                variance[week] += square * probability * (1 - probability)
+            else:
+                beyond += amount * probability
+
+    def money(value):
+        return Decimal(value).quantize(CENT)
+
+    rows = []
+    for week in range(week_count):
+        amounts = {source: expected[source][week] for source in SOURCES}
+        total = sum(amounts.values())
+        spread = BAND_Z * math.sqrt(variance[week])
+        rows.append({
+            'week_start': start + timedelta(weeks=week),
+            'expected': money(total),
+            'low': money(max(total - spread, 0)),
+            'high': money(total + spread),
+            **{source: money(value) for source, value in amounts.items()},
+        })
+    return {
+        'start': start,
+        'end': end,
+        'weeks': rows,
+        'total_expected': sum((row['expected'] for row in rows), Decimal('0.00')),
+        'beyond_horizon': money(beyond),
+        'overdue_beyond_history': money(stale),
+        'clients_with_history': len(by_client),
+    }
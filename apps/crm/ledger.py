@@ -0,0 +1,87 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import PaymentInstallment, ProjectFinancialSummary
+from .summaries import refresh_project_summaries
+
+
+CENT = Decimal('0.01')
+
+
+class BudgetExceeded(ValueError):
+    """The amount is larger than what is left of the project budget"""
+    def __init__(self, amount, available):
+        super().__init__(f'Amount ₹{amount} exceeds remaining budget ₹{available}. Please enter a smaller amount.')
+        self.amount = amount
+        self.available = available
+
+
+def parse_amount(value):
+    """Form/JSON input -> positive Decimal with two places, never via float"""
+    try:
+        amount = Decimal(str(value).strip()).quantize(CENT)
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'"{value}" is not a valid amount.')
+    if not amount.is_finite() or amount <= 0:
+        raise ValueError('Amount must be greater than zero.')
+    return amount
+
+
+def available_budget(summary):
+    """Budget not yet billed by any non-cancelled installment (paid, pending or overdue)"""
+    return summary.remaining_budget - summary.total_pending - summary.total_overdue
+
+
+def lock_project_summary(project_id):
+    """
+    Lock the project's summary row until the transaction ends. Only this
+    project's writers wait; other projects lock their own rows.
+    """
+    queryset = ProjectFinancialSummary.objects.filter(project_id=project_id)
+    if connection.features.has_select_for_update:
+        if not queryset.exists():
+            refresh_project_summaries([project_id])
+    elif not queryset.update(updated_at=timezone.now()):
+        # SQLite ignores FOR UPDATE; writing first takes its database lock
+        # before anything is read, so the read below can't go stale
+        refresh_project_summaries([project_id])
+    return queryset.select_for_update().get()
+
+
+def create_installment(project_id, amount, created_by, **fields):
+    """Check the budget and insert under the project lock, returns the installment."""
+    amount = parse_amount(amount)
+    with transaction.atomic():
+        summary = lock_project_summary(project_id)
+        available = available_budget(summary)
+        if amount > available:
+            raise BudgetExceeded(amount, available)
+        # post_save refreshes the summary inside this transaction
+        return PaymentInstallment.objects.create(
+            project_id=project_id, amount=amount, created_by=created_by, **fields
+        )
+
+
+def update_installment(installment, amount, **fields):
+    """Save changes to an installment, re-checking the budget of its (new) project."""
+    amount = parse_amount(amount)
+    project_id = fields.pop('project_id', installment.project_id)
+    with transaction.atomic():
+        summary = lock_project_summary(project_id)
+        current = PaymentInstallment.objects.select_for_update().get(pk=installment.pk)
+        same_project = current.project_id == int(project_id)
+        # Lowering an amount (or editing other fields) never needs budget
+        if not (same_project and amount <= current.amount):
+            available = available_budget(summary)
+            # The installment's own amount is already billed to its project
+            if same_project and current.status != 'cancelled':
+                available += current.amount
+            if amount > available:
+                raise BudgetExceeded(amount, available)
+        installment.project_id = project_id
+        installment.amount = amount
+        for name, value in fields.items():
+            setattr(installment, name, value)
+        installment.save()
+        return installment
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.crm.segments import compute_client_segments, segment_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute RFM scores, segments and lifetime value for every paying client'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        segments = compute_client_segments()
+        elapsed = time.monotonic() - started
+        
+        for label, count in segment_counts(segments):
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Segmented {len(segments)} client(s) in {elapsed:.2f}s.'
+            )
+        )
@@ -1,10 +1,11 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from apps.crm.models import PaymentInstallment
+from apps.crm.summaries import refresh_past_due_summaries
 
 
 class Command(BaseCommand):
-    help = 'Mark overdue payment installments as overdue'
+    help = 'Mark overdue payment installments as overdue and refresh the summaries they fall into (run daily)'
 
     def handle(self, *args, **options):
         today = timezone.now().date()
@@ -36,3 +37,11 @@ class Command(BaseCommand):
                     f'Successfully marked {count} payment(s) as overdue.'
                 )
             )
+        
+        # Summaries split pending/overdue on the due date, which passes without any write
+        refreshed = refresh_past_due_summaries(today)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Refreshed financial summaries of {refreshed} project(s) with newly past-due installments.'
+            )
+        )
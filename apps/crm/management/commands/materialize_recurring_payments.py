@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.crm.recurring import materialize_plans
+
+
+class Command(BaseCommand):
+    help = 'Create payment installments for recurring plan occurrences due within the rolling horizon (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon-days',
+            type=int,
+            default=settings.RECURRING_PAYMENT_HORIZON_DAYS,
+            help=f'Days ahead to materialize (default: {settings.RECURRING_PAYMENT_HORIZON_DAYS})'
+        )
+
+    def handle(self, *args, **options):
+        plans, created = materialize_plans(days=options['horizon_days'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Materialized {created} installment(s) from {plans} recurring plan(s), '
+                f'{options["horizon_days"]} days ahead.'
+            )
+        )
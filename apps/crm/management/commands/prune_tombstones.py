@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.crm.models import DeletionTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete deletion tombstones older than the sync retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Keep tombstones newer than this many days (default: 90)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        
+        deleted, _ = DeletionTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Removed {deleted} tombstone(s) older than {options["days"]} days.'
+            )
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.crm.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute project and client financial summaries from payment installments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Projects recomputed per transaction (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        projects, clients = rebuild_summaries(batch_size=options['batch_size'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt financial summaries for {projects} project(s) and {clients} client(s).'
+            )
+        )
@@ -0,0 +1,107 @@
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections
+from django.utils import timezone
+from apps.clients.models import Client
+from apps.projects.models import Project
+from apps.crm.ledger import BudgetExceeded, create_installment
+from apps.crm.models import PaymentInstallment, ProjectFinancialSummary
+
+
+class Command(BaseCommand):
+    help = 'Race threads creating installments against the configured database and check no budget is overspent'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent writers (default: 8)')
+        parser.add_argument('--attempts', type=int, default=10, help='Installments each thread tries to create (default: 10)')
+        parser.add_argument('--projects', type=int, default=2, help='Scratch projects the threads spread over (default: 2)')
+        parser.add_argument('--budget', default='10000', help='Budget of each scratch project (default: 10000)')
+        parser.add_argument('--amount', default='333.33', help='Amount of each installment (default: 333.33)')
+        parser.add_argument('--keep', action='store_true', help='Keep the scratch client, projects and installments')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if user is None:
+            raise CommandError('Create a user first, installments need a created_by.')
+
+        budget = Decimal(options['budget'])
+        today = timezone.now().date()
+        client = Client.objects.create(name='Ledger stress test', email='ledger-stress@example.com')
+        projects = [
+            Project.objects.create(
+                title=f'Ledger stress test {index + 1}',
+                description='Scratch project for stress_installment_ledger',
+                client=client,
+                start_date=today,
+                due_date=today + timedelta(days=30),
+                budget=budget,
+            )
+            for index in range(options['projects'])
+        ]
+
+        counts = {'created': 0, 'rejected': 0, 'retried': 0}
+        lock = threading.Lock()
+
+        def worker(number):
+            try:
+                for attempt in range(options['attempts']):
+                    project = projects[(number + attempt) % len(projects)]
+                    for retry in range(5):
+                        try:
+                            create_installment(
+                                project.pk,
+                                amount=options['amount'],
+                                created_by=user,
+                                title=f'Stress {number}-{attempt}',
+                                due_date=today,
+                            )
+                            outcome = 'created'
+                        except BudgetExceeded:
+                            outcome = 'rejected'
+                        except OperationalError:
+                            # SQLite gives up waiting for its lock after the timeout
+                            with lock:
+                                counts['retried'] += 1
+                            time.sleep(0.05 * (retry + 1))
+                            continue
+                        with lock:
+                            counts[outcome] += 1
+                        break
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        failures = []
+        for project in projects:
+            billed = sum(
+                PaymentInstallment.objects.filter(project=project).exclude(status='cancelled').values_list('amount', flat=True),
+                Decimal('0')
+            )
+            summary = ProjectFinancialSummary.objects.get(project=project)
+            self.stdout.write(f'{project.title}: billed ₹{billed} of ₹{budget} (summary says ₹{summary.total_billed})')
+            if billed > budget or summary.total_billed != billed:
+                failures.append(project.title)
+
+        self.stdout.write(
+            f"{counts['created']} created, {counts['rejected']} rejected, "
+            f"{counts['retried']} lock timeout(s) retried in {elapsed:.2f}s"
+        )
+
+        if not options['keep']:
+            client.delete()
+
+        if failures:
+            raise CommandError(f'Budget overspent or summary out of sync for: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('No project was billed beyond its budget.'))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('crm', '0002_paymentinstallment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. clients.client', max_length=100)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('owner', models.ForeignKey(blank=True, help_text='User the object was assigned to when it was deleted', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Deletion Tombstone',
+                'verbose_name_plural': 'Deletion Tombstones',
+                'ordering': ['-deleted_at'],
+                'indexes': [models.Index(fields=['model', 'deleted_at'], name='crm_deletio_model_6566ec_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_client_updated_at_index'),
+        ('projects', '0004_projectrequirement_updated_at_and_indexes'),
+        ('crm', '0003_deletiontombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientFinancialSummary',
+            fields=[
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, help_text='All non-cancelled installments', max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_pending', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_overdue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('remaining_budget', models.DecimalField(decimal_places=2, default=0, help_text='Budget minus total paid', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to='clients.client')),
+            ],
+            options={
+                'verbose_name': 'Client Financial Summary',
+                'verbose_name_plural': 'Client Financial Summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectFinancialSummary',
+            fields=[
+                ('total_billed', models.DecimalField(decimal_places=2, default=0, help_text='All non-cancelled installments', max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_pending', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_overdue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('remaining_budget', models.DecimalField(decimal_places=2, default=0, help_text='Budget minus total paid', max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'Project Financial Summary',
+                'verbose_name_plural': 'Project Financial Summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0004_projectrequirement_updated_at_and_indexes'),
+        ('crm', '0004_financial_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringPaymentPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(help_text="Occurrences are titled '<title> - <due month or date>'", max_length=200)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Amount of each occurrence', max_digits=10)),
+                ('payment_type', models.CharField(choices=[('advance', 'Advance Payment'), ('milestone', 'Milestone Payment'), ('final', 'Final Payment'), ('installment', 'Regular Installment')], default='installment', max_length=20)),
+                ('cadence', models.CharField(choices=[('weekly', 'Weekly'), ('biweekly', 'Every two weeks'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly')], default='monthly', max_length=20)),
+                ('start_date', models.DateField(help_text='Due date of the first occurrence')),
+                ('end_date', models.DateField(blank=True, help_text='No occurrences after this date; empty runs until cancelled', null=True)),
+                ('max_occurrences', models.PositiveIntegerField(blank=True, help_text='Stop after this many occurrences', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('notes', models.TextField(blank=True, help_text='Copied to every occurrence')),
+                ('materialized_through', models.DateField(blank=True, help_text='Occurrences due up to this date exist as installments', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Recurring Payment Plan',
+                'verbose_name_plural': 'Recurring Payment Plans',
+                'ordering': ['start_date', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='recurringpaymentplan',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_payment_plans', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='recurringpaymentplan',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_plans', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='paymentinstallment',
+            name='recurring_plan',
+            field=models.ForeignKey(blank=True, help_text='Plan this occurrence was materialized from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='installments', to='crm.recurringpaymentplan'),
+        ),
+        migrations.AddConstraint(
+            model_name='paymentinstallment',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurring_plan__isnull', False)), fields=('recurring_plan', 'due_date'), name='unique_recurring_occurrence'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('crm', '0005_recurring_payment_plans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('description', models.TextField(blank=True, help_text='Default project description')),
+                ('default_budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('duration_days', models.PositiveIntegerField(default=30, help_text='Due date is this many days after the start date')),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], default='medium', max_length=20)),
+                ('split_strategy', models.CharField(blank=True, choices=[('equal', 'Equal installments'), ('milestones', 'Advance + milestones + final'), ('percentages', 'Percentage list')], help_text='Leave empty to create no installments', max_length=20)),
+                ('installment_count', models.PositiveIntegerField(blank=True, help_text='Installments (equal) or milestones (milestones)', null=True)),
+                ('cadence', models.CharField(choices=[('weekly', 'Weekly'), ('biweekly', 'Every two weeks'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly')], default='monthly', max_length=20)),
+                ('advance_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('final_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('percentages', models.CharField(blank=True, help_text='Comma separated, must add up to 100', max_length=500)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Project Template',
+                'verbose_name_plural': 'Project Templates',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTemplateRequirement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='requirements', to='crm.projecttemplate')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+            },
+        ),
+    ]
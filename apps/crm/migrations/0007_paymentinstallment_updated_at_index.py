@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0006_project_templates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentinstallment',
+            index=models.Index(fields=['updated_at'], name='crm_payment_updated_60bf34_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.9 on 2026-10-19 17:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0003_client_updated_at_index'),
+        ('crm', '0007_paymentinstallment_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientSegment',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='segment', serialize=False, to='clients.client')),
+                ('recency_days', models.PositiveIntegerField(help_text='Days since the last payment')),
+                ('frequency', models.PositiveIntegerField(help_text='Paid installments and payments')),
+                ('monetary', models.DecimalField(decimal_places=2, help_text='Total received', max_digits=14)),
+                ('first_paid', models.DateField()),
+                ('last_paid', models.DateField()),
+                ('recency_score', models.PositiveSmallIntegerField(help_text='1-5 quintile, 5 = paid most recently')),
+                ('frequency_score', models.PositiveSmallIntegerField(help_text='1-5 quintile')),
+                ('monetary_score', models.PositiveSmallIntegerField(help_text='1-5 quintile')),
+                ('rfm_score', models.PositiveSmallIntegerField(help_text='Sum of the three scores, 3-15')),
+                ('lifetime_value', models.DecimalField(decimal_places=2, help_text='Total received plus expected future revenue, see apps.crm.segments', max_digits=14)),
+                ('segment', models.CharField(choices=[('champions', 'Champions'), ('loyal', 'Loyal'), ('new', 'New'), ('potential', 'Potential'), ('at_risk', 'At Risk'), ('hibernating', 'Hibernating')], max_length=20)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Client Segment',
+                'verbose_name_plural': 'Client Segments',
+                'indexes': [models.Index(fields=['segment'], name='crm_clients_segment_a84b03_idx'), models.Index(fields=['rfm_score'], name='crm_clients_rfm_sco_4b0632_idx'), models.Index(fields=['lifetime_value'], name='crm_clients_lifetim_dfe284_idx')],
+            },
+        ),
+    ]
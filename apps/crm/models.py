@@ -1,5 +1,10 @@
+from datetime import timedelta
+
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from apps.projects.models import Project
+from .cadence import CADENCES, first_index_on_or_after, nth_date
 
 
 class CustomSMTPConfig(models.Model):
@@ -39,6 +44,29 @@ class CustomSMTPConfig(models.Model):
         }
 
 
+class PaymentInstallmentQuerySet(models.QuerySet):
+    def with_overdue(self, today=None):
+        """
+        Annotate is_overdue and days_overdue in SQL so lists can filter and
+        sort on them; the model properties return these when present.
+        """
+        from django.utils import timezone
+        today = today or timezone.now().date()
+        overdue = models.Q(status__in=['pending', 'overdue'], due_date__lt=today)
+        return self.annotate(
+            is_overdue=models.Case(
+                models.When(overdue, then=models.Value(True)),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            ),
+            days_overdue=models.Case(
+                models.When(overdue, then=models.Value(today) - models.F('due_date')),
+                default=models.Value(timedelta(0)),
+                output_field=models.DurationField(),
+            ),
+        )
+
+
 class PaymentInstallment(models.Model):
     """Payment installment model for tracking project payments"""
     
@@ -65,13 +93,29 @@ class PaymentInstallment(models.Model):
     status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, help_text="Additional notes about this payment")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_payments')
+    recurring_plan = models.ForeignKey('RecurringPaymentPlan', on_delete=models.SET_NULL, null=True, blank=True,
+                                       related_name='installments', help_text="Plan this occurrence was materialized from")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PaymentInstallmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Payment Installment"
         verbose_name_plural = "Payment Installments"
         ordering = ['-due_date', '-created_at']
+        indexes = [
+            # Change cursor of apps.crm.receivables
+            models.Index(fields=['updated_at']),
+        ]
+        constraints = [
+            # A plan occurrence is materialized at most once
+            models.UniqueConstraint(
+                fields=['recurring_plan', 'due_date'],
+                condition=models.Q(recurring_plan__isnull=False),
+                name='unique_recurring_occurrence',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - ₹{self.amount} ({self.get_status_display()})"
@@ -79,19 +123,38 @@ class PaymentInstallment(models.Model):
     @property
     def is_overdue(self):
         """Check if payment is overdue"""
+        if '_is_overdue' in self.__dict__:
+            return self._is_overdue
         from django.utils import timezone
         today = timezone.now().date()
-        return self.status == 'pending' and self.due_date < today
+        return self.status in ('pending', 'overdue') and self.due_date < today
+    
+    @is_overdue.setter
+    def is_overdue(self, value):
+        # Set by PaymentInstallmentQuerySet.with_overdue()
+        self._is_overdue = value
     
     @property
     def days_overdue(self):
         """Calculate days overdue"""
+        if '_days_overdue' in self.__dict__:
+            return self._days_overdue
         if not self.is_overdue:
             return 0
         from django.utils import timezone
         today = timezone.now().date()
         return (today - self.due_date).days
     
+    @days_overdue.setter
+    def days_overdue(self, value):
+        self._days_overdue = value.days if isinstance(value, timedelta) else value
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # with_overdue() values describe the row as loaded, recompute from the saved fields
+        self.__dict__.pop('_is_overdue', None)
+        self.__dict__.pop('_days_overdue', None)
+    
     def mark_as_paid(self, paid_date=None):
         """Mark payment as paid"""
         from django.utils import timezone
@@ -106,6 +169,157 @@ class PaymentInstallment(models.Model):
             self.save()
 
 
+class RecurringPaymentPlan(models.Model):
+    """
+    A retainer-style plan: `amount` every `cadence` from `start_date`.
+    Occurrences are computed on demand by occurrences(); only the ones
+    inside the rolling horizon are stored as PaymentInstallment rows, by
+    the materialize_recurring_payments command.
+    """
+    
+    project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='recurring_plans')
+    title = models.CharField(max_length=200, help_text="Occurrences are titled '<title> - <due month or date>'")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Amount of each occurrence")
+    payment_type = models.CharField(max_length=20, choices=PaymentInstallment.PAYMENT_TYPE_CHOICES, default='installment')
+    cadence = models.CharField(max_length=20, choices=CADENCES, default='monthly')
+    start_date = models.DateField(help_text="Due date of the first occurrence")
+    end_date = models.DateField(null=True, blank=True, help_text="No occurrences after this date; empty runs until cancelled")
+    max_occurrences = models.PositiveIntegerField(null=True, blank=True, help_text="Stop after this many occurrences")
+    is_active = models.BooleanField(default=True)
+    notes = models.TextField(blank=True, help_text="Copied to every occurrence")
+    materialized_through = models.DateField(null=True, blank=True,
+                                            help_text="Occurrences due up to this date exist as installments")
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recurring_payment_plans')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Recurring Payment Plan"
+        verbose_name_plural = "Recurring Payment Plans"
+        ordering = ['start_date', 'id']
+    
+    def __str__(self):
+        return f"{self.title} - ₹{self.amount} {self.get_cadence_display().lower()}"
+    
+    def occurrences(self, start=None, end=None):
+        """
+        Yield (number, due_date) for occurrences due in [start, end], numbered
+        from 1. Nothing is stored; without `end` the generator stops only at
+        end_date/max_occurrences, so bound it when the plan is open-ended.
+        """
+        index = first_index_on_or_after(self.start_date, self.cadence, start) if start else 0
+        while self.max_occurrences is None or index < self.max_occurrences:
+            due_date = nth_date(self.start_date, self.cadence, index)
+            if (end and due_date > end) or (self.end_date and due_date > self.end_date):
+                return
+            index += 1
+            yield index, due_date
+    
+    def build_installment(self, due_date):
+        """Unsaved installment for one occurrence"""
+        from django.utils import timezone
+        fmt = '%b %Y' if self.cadence in ('monthly', 'quarterly') else '%d %b %Y'
+        return PaymentInstallment(
+            project_id=self.project_id,
+            recurring_plan=self,
+            title=f"{self.title} - {due_date.strftime(fmt)}",
+            amount=self.amount,
+            payment_type=self.payment_type,
+            due_date=due_date,
+            status='overdue' if due_date < timezone.now().date() else 'pending',
+            notes=self.notes,
+            created_by_id=self.created_by_id,
+        )
+    
+    def virtual_installments(self, start=None, end=None):
+        """Unsaved installments for occurrences not materialized yet, due in [start, end]"""
+        if not self.is_active:
+            return
+        if self.materialized_through and (start is None or start <= self.materialized_through):
+            start = self.materialized_through + timedelta(days=1)
+        for _, due_date in self.occurrences(start, end):
+            yield self.build_installment(due_date)
+
+
+class ProjectTemplate(models.Model):
+    """
+    A reusable starting point for similar projects: default requirements
+    and an installment split that apps.crm.project_templates applies to
+    the new project's budget.
+    """
+    
+    SPLIT_STRATEGY_CHOICES = [
+        ('equal', 'Equal installments'),
+        ('milestones', 'Advance + milestones + final'),
+        ('percentages', 'Percentage list'),
+    ]
+    
+    name = models.CharField(max_length=200, unique=True)
+    description = models.TextField(blank=True, help_text="Default project description")
+    default_budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    duration_days = models.PositiveIntegerField(default=30, help_text="Due date is this many days after the start date")
+    priority = models.CharField(max_length=20, choices=Project.PRIORITY_CHOICES, default='medium')
+    split_strategy = models.CharField(max_length=20, choices=SPLIT_STRATEGY_CHOICES, blank=True,
+                                      help_text="Leave empty to create no installments")
+    installment_count = models.PositiveIntegerField(null=True, blank=True,
+                                                    help_text="Installments (equal) or milestones (milestones)")
+    cadence = models.CharField(max_length=20, choices=CADENCES, default='monthly')
+    advance_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    final_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    percentages = models.CharField(max_length=500, blank=True, help_text="Comma separated, must add up to 100")
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_templates')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Project Template"
+        verbose_name_plural = "Project Templates"
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def percentage_list(self):
+        return self.percentages.replace(',', ' ').split()
+    
+    def clean(self):
+        """Try the split on the default budget (or 100) so a broken one is rejected on save, not on use"""
+        if not self.split_strategy:
+            return
+        from django.utils import timezone
+        from .schedules import plan_schedule
+        try:
+            plan_schedule(
+                total=self.default_budget or 100,
+                strategy=self.split_strategy,
+                start_date=timezone.now().date(),
+                cadence=self.cadence,
+                count=self.installment_count,
+                advance_percent=self.advance_percent,
+                final_percent=self.final_percent,
+                percentages=self.percentage_list(),
+            )
+        except ValueError as e:
+            field = {'equal': 'installment_count', 'percentages': 'percentages'}.get(self.split_strategy)
+            raise ValidationError({field: str(e)} if field else str(e))
+
+
+class ProjectTemplateRequirement(models.Model):
+    """A requirement copied onto every project created from the template"""
+    
+    template = models.ForeignKey(ProjectTemplate, on_delete=models.CASCADE, related_name='requirements')
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    position = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['position', 'id']
+    
+    def __str__(self):
+        return f"{self.title} - {self.template.name}"
+
+
 class EmailLog(models.Model):
     """Log of emails sent using custom SMTP"""
     
@@ -132,3 +346,106 @@ class EmailLog(models.Model):
     def __str__(self):
         return f"{self.subject} to {self.recipient} ({self.status})"
 
+
+class DeletionTombstone(models.Model):
+    """Record of a deleted CRM object so API consumers can sync deletes"""
+    
+    model = models.CharField(max_length=100, help_text="Model label, e.g. clients.client")
+    object_id = models.BigIntegerField()
+    owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+                              help_text="User the object was assigned to when it was deleted")
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        verbose_name = "Deletion Tombstone"
+        verbose_name_plural = "Deletion Tombstones"
+        ordering = ['-deleted_at']
+        indexes = [
+            models.Index(fields=['model', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted at {self.deleted_at}"
+
+
+class FinancialSummary(models.Model):
+    """Installment totals kept current by apps.crm.summaries"""
+    
+    total_billed = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="All non-cancelled installments")
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_pending = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_overdue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    remaining_budget = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Budget minus total paid")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+
+
+class ProjectFinancialSummary(FinancialSummary):
+    """One row per project, the budget check reads this instead of summing installments"""
+    
+    project = models.OneToOneField('projects.Project', on_delete=models.CASCADE, primary_key=True,
+                                   related_name='financial_summary')
+    
+    class Meta:
+        verbose_name = "Project Financial Summary"
+        verbose_name_plural = "Project Financial Summaries"
+    
+    def __str__(self):
+        return f"{self.project_id}: paid ₹{self.total_paid}, remaining ₹{self.remaining_budget}"
+
+
+class ClientFinancialSummary(FinancialSummary):
+    """Per-client roll-up of its projects' summaries"""
+    
+    client = models.OneToOneField('clients.Client', on_delete=models.CASCADE, primary_key=True,
+                                  related_name='financial_summary')
+    
+    class Meta:
+        verbose_name = "Client Financial Summary"
+        verbose_name_plural = "Client Financial Summaries"
+    
+    def __str__(self):
+        return f"{self.client_id}: paid ₹{self.total_paid}, remaining ₹{self.remaining_budget}"
+
+
+class ClientSegment(models.Model):
+    """RFM scores and lifetime value per paying client, rebuilt by compute_client_segments"""
+    
+    SEGMENT_CHOICES = [
+        ('champions', 'Champions'),
+        ('loyal', 'Loyal'),
+        ('new', 'New'),
+        ('potential', 'Potential'),
+        ('at_risk', 'At Risk'),
+        ('hibernating', 'Hibernating'),
+    ]
+    
+    client = models.OneToOneField('clients.Client', on_delete=models.CASCADE, primary_key=True,
+                                  related_name='segment')
+    recency_days = models.PositiveIntegerField(help_text="Days since the last payment")
+    frequency = models.PositiveIntegerField(help_text="Paid installments and payments")
+    monetary = models.DecimalField(max_digits=14, decimal_places=2, help_text="Total received")
+    first_paid = models.DateField()
+    last_paid = models.DateField()
+    recency_score = models.PositiveSmallIntegerField(help_text="1-5 quintile, 5 = paid most recently")
+    frequency_score = models.PositiveSmallIntegerField(help_text="1-5 quintile")
+    monetary_score = models.PositiveSmallIntegerField(help_text="1-5 quintile")
+    rfm_score = models.PositiveSmallIntegerField(help_text="Sum of the three scores, 3-15")
+    lifetime_value = models.DecimalField(max_digits=14, decimal_places=2,
+                                         help_text="Total received plus expected future revenue, see apps.crm.segments")
+    segment = models.CharField(max_length=20, choices=SEGMENT_CHOICES)
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Client Segment"
+        verbose_name_plural = "Client Segments"
+        indexes = [
+            models.Index(fields=['segment']),
+            models.Index(fields=['rfm_score']),
+            models.Index(fields=['lifetime_value']),
+        ]
+    
+    def __str__(self):
+        return f"{self.client_id}: {self.get_segment_display()} (RFM {self.recency_score}{self.frequency_score}{self.monetary_score})"
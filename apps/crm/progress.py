@@ -0,0 +1,47 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+from apps.projects.models import Project, ProjectRequirement
+
+
+def progress_expression(total, done):
+    """Completed percent (0 without requirements) from two counter expressions"""
+    return Coalesce(done * 100 / NullIf(total, 0), Value(0), output_field=IntegerField())
+
+
+def adjust_requirement_counts(project_id, total=0, done=0):
+    """
+    Shift one project's counters by the given deltas in a single UPDATE.
+    F() keeps concurrent requirement saves from overwriting each other.
+    """
+    if not (total or done) or project_id is None:
+        return
+    new_total = F('requirements_total') + total
+    new_done = F('requirements_done') + done
+    Project.objects.filter(pk=project_id).update(
+        requirements_total=new_total,
+        requirements_done=new_done,
+        requirement_progress=progress_expression(new_total, new_done),
+        # update() skips auto_now, delta sync must still see the change
+        updated_at=timezone.now(),
+    )
+
+
+def recount_requirements(project_ids):
+    """
+    Recompute these projects' counters from their requirement rows, for
+    set-based writes that send no per-row signals.
+    """
+    def count(condition=Q()):
+        return Coalesce(Subquery(
+            ProjectRequirement.objects.filter(condition, project=OuterRef('pk'))
+            .order_by().values('project').annotate(count=Count('pk')).values('count')
+        ), Value(0))
+
+    projects = Project.objects.filter(pk__in=list(project_ids))
+    projects.update(
+        requirements_total=count(),
+        requirements_done=count(Q(is_completed=True)),
+        updated_at=timezone.now(),
+    )
+    projects.update(requirement_progress=progress_expression(F('requirements_total'), F('requirements_done')))
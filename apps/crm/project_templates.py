@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.db import transaction
+from apps.projects.models import Project, ProjectRequirement
+from .bulk import bulk_updated
+from .schedules import build_schedule, create_schedule
+
+
+def instantiate_template(template, client, created_by, title, start_date, budget=None, assigned_to=None,
+                         description=None):
+    """
+    Create a project from the template, with all of its requirements and
+    its installment split (applied to the budget) bulk-inserted in the same
+    transaction. Nothing is saved if any step fails. Raises ValueError for
+    a split that doesn't work with the budget; returns the project.
+    """
+    budget = template.default_budget if budget is None else budget
+    requirements = list(template.requirements.all())
+
+    with transaction.atomic():
+        project = Project.objects.create(
+            title=title,
+            description=template.description if description is None else description,
+            client=client,
+            assigned_to=assigned_to or created_by,
+            priority=template.priority,
+            start_date=start_date,
+            due_date=start_date + timedelta(days=template.duration_days),
+            budget=budget,
+        )
+
+        created = ProjectRequirement.objects.bulk_create([
+            ProjectRequirement(project=project, title=requirement.title, description=requirement.description)
+            for requirement in requirements
+        ])
+        if created:
+            bulk_updated.send(
+                sender=ProjectRequirement, pks=[requirement.pk for requirement in created], project_ids=[project.pk]
+            )
+
+        if template.split_strategy:
+            if not budget:
+                raise ValueError(f'Template "{template.name}" has an installment split, the project needs a budget.')
+            create_schedule(build_schedule(
+                project,
+                created_by,
+                total=budget,
+                strategy=template.split_strategy,
+                cadence=template.cadence,
+                start_date=start_date,
+                count=template.installment_count,
+                advance_percent=template.advance_percent,
+                final_percent=template.final_percent,
+                percentages=template.percentage_list(),
+            ))
+    return project
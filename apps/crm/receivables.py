@@ -0,0 +1,268 @@
+import threading
+import time
+from array import array
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import compress, repeat
+from operator import and_, lt
+
+from django.conf import settings
+from django.utils import timezone
+from apps.projects.models import Project
+from .models import PaymentInstallment
+
+
+STATUS_CODES = {status: code for code, (status, _) in enumerate(PaymentInstallment.PAYMENT_STATUS_CHOICES)}
+OUTSTANDING = frozenset({STATUS_CODES['pending'], STATUS_CODES['overdue']})
+BILLED = frozenset(code for status, code in STATUS_CODES.items() if status != 'cancelled')
+
+# Rows committed late with an older updated_at are still picked up
+CURSOR_OVERLAP = timedelta(seconds=30)
+
+COLUMNS = {
+    'id': 'q',
+    'amount': 'q',          # paise, sums stay exact integers
+    'due': 'l',             # date.toordinal()
+    'due_month': 'l',       # year * 12 + month - 1
+    'paid': 'l',            # 0 when unpaid
+    'paid_month': 'l',
+    'status': 'b',          # STATUS_CODES
+    'project': 'q',
+    'client': 'q',
+}
+
+
+def month_key(day):
+    return day.year * 12 + day.month - 1
+
+
+def month_start(key):
+    return date(key // 12, key % 12 + 1, 1)
+
+
+def to_money(paise):
+    return Decimal(paise).scaleb(-2)
+
+
+class ReceivablesCache:
+    """
+    Process-local columnar snapshot of PaymentInstallment: one typed array
+    per column, one slot per installment. Reads first catch up with the
+    database (at most every `refresh_interval` seconds) by loading only the
+    rows changed since the last updated_at seen; a full reload every
+    `reload_interval` seconds is the backstop for anything a cursor misses.
+    Aggregates then run over the arrays without touching the database.
+    """
+    def __init__(self, refresh_interval=5, reload_interval=3600):
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._reset()
+        self.refreshes = self.reloads = 0
+
+    def _reset(self):
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self._slots = {}                    # installment id -> row index
+        self._clients = {}                  # project id -> client id
+        self._cursor = None                 # newest updated_at loaded
+        self._project_cursor = None
+        self._checked = self._loaded = float('-inf')
+
+    def mark_stale(self):
+        """Catch up on the next read, for writes made by this process"""
+        self._checked = float('-inf')
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if force or now - self._loaded >= self.reload_interval:
+                self._reset()
+                self._load(PaymentInstallment.objects.all(), Project.objects.all())
+                self._loaded = now
+                self.reloads += 1
+            elif now - self._checked >= self.refresh_interval:
+                self._load(
+                    PaymentInstallment.objects.filter(updated_at__gte=self._cursor - CURSOR_OVERLAP)
+                    if self._cursor else PaymentInstallment.objects.all(),
+                    Project.objects.filter(updated_at__gte=self._project_cursor - CURSOR_OVERLAP)
+                    if self._project_cursor else Project.objects.all(),
+                )
+                self._drop_deleted()
+                self.refreshes += 1
+            self._checked = now
+
+    def _load(self, installments, projects):
+        moved = {}
+        for pk, client_id, updated_at in projects.values_list('pk', 'client_id', 'updated_at').order_by():
+            if self._clients.get(pk, client_id) != client_id:
+                moved[pk] = client_id
+            self._clients[pk] = client_id
+            self._project_cursor = max(self._project_cursor or updated_at, updated_at)
+        if moved:
+            columns = self.columns
+            for index, project_id in enumerate(columns['project']):
+                if project_id in moved:
+                    columns['client'][index] = moved[project_id]
+
+        rows = installments.values_list(
+            'pk', 'amount', 'due_date', 'paid_date', 'status', 'project_id', 'project__client_id', 'updated_at'
+        ).order_by()
+        for pk, amount, due_date, paid_date, status, project_id, client_id, updated_at in rows.iterator(chunk_size=5000):
+            self._store(pk, (
+                pk,
+                int(amount * 100),
+                due_date.toordinal(),
+                month_key(due_date),
+                paid_date.toordinal() if paid_date else 0,
+                month_key(paid_date) if paid_date else 0,
+                STATUS_CODES.get(status, -1),
+                project_id,
+                client_id,
+            ))
+            self._clients[project_id] = client_id
+            self._cursor = max(self._cursor or updated_at, updated_at)
+
+    def _store(self, pk, values):
+        index = self._slots.get(pk)
+        if index is None:
+            self._slots[pk] = len(self.columns['id'])
+            for column, value in zip(self.columns.values(), values):
+                column.append(value)
+        else:
+            for column, value in zip(self.columns.values(), values):
+                column[index] = value
+
+    def _drop_deleted(self):
+        # Deletes leave no updated_at behind; more slots than rows means some happened
+        if len(self._slots) <= PaymentInstallment.objects.count():
+            return
+        existing = set(PaymentInstallment.objects.values_list('pk', flat=True).order_by())
+        for pk in [pk for pk in self._slots if pk not in existing]:
+            self._remove(pk)
+
+    def _remove(self, pk):
+        # Move the last row into the hole so the columns stay dense
+        index = self._slots.pop(pk)
+        last = len(self.columns['id']) - 1
+        for column in self.columns.values():
+            if index != last:
+                column[index] = column[last]
+            column.pop()
+        if index != last:
+            self._slots[self.columns['id'][index]] = index
+
+    def _mask(self, statuses=None, projects=None, clients=None):
+        """Row selector combining the given filters, None when nothing is filtered"""
+        masks = []
+        if statuses is not None:
+            masks.append(map(statuses.__contains__, self.columns['status']))
+        if projects is not None:
+            masks.append(map(set(projects).__contains__, self.columns['project']))
+        if clients is not None:
+            masks.append(map(set(clients).__contains__, self.columns['client']))
+        if not masks:
+            return None
+        mask = masks[0]
+        for other in masks[1:]:
+            mask = map(and_, mask, other)
+        return list(mask)
+
+    def _select(self, column, mask):
+        return self.columns[column] if mask is None else compress(self.columns[column], mask)
+
+    def totals(self, today=None, projects=None, clients=None):
+        """
+        Installment totals like apps.crm.summaries.installment_totals, so
+        pending/overdue split on the due date like
+        PaymentInstallment.objects.with_overdue(). past_due_total repeats
+        total_overdue next to past_due_count.
+        """
+        self.refresh()
+        today = (today or timezone.now().date()).toordinal()
+        with self._lock:
+            scope = self._mask(projects=projects, clients=clients)
+            amount = list(self._select('amount', scope))
+            status = list(self._select('status', scope))
+            due = list(self._select('due', scope))
+
+            def total(statuses):
+                return sum(compress(amount, map(statuses.__contains__, status)))
+
+            past_due = list(map(and_, map(OUTSTANDING.__contains__, status), map(lt, due, repeat(today))))
+            past_due_total = sum(compress(amount, past_due))
+            return {
+                'total_billed': to_money(total(BILLED)),
+                'total_paid': to_money(total({STATUS_CODES['paid']})),
+                'total_pending': to_money(total(OUTSTANDING) - past_due_total),
+                'total_overdue': to_money(past_due_total),
+                'past_due_total': to_money(past_due_total),
+                'past_due_count': sum(past_due),
+                'count': len(amount),
+            }
+
+    def monthly(self, start, end, by='paid', statuses=None, projects=None, clients=None):
+        """
+        [(first day of month, total), ...] for every month from start to end
+        inclusive, bucketed on the paid or due date. Paid totals only count
+        paid installments unless `statuses` says otherwise.
+        """
+        if statuses is None:
+            statuses = {STATUS_CODES['paid']} if by == 'paid' else BILLED
+        self.refresh()
+        first, last = month_key(start), month_key(end)
+        buckets = dict.fromkeys(range(first, last + 1), 0)
+        with self._lock:
+            mask = self._mask(statuses=statuses, projects=projects, clients=clients)
+            for key, amount in zip(self._select(by + '_month', mask), self._select('amount', mask)):
+                if first <= key <= last:
+                    buckets[key] += amount
+        return [(month_start(key), to_money(total)) for key, total in buckets.items()]
+
+    def by_project(self, statuses=None, projects=None, clients=None):
+        """{project id: total} over the installments with these status codes (default: billed)"""
+        return self._group('project', BILLED if statuses is None else statuses, projects, clients)
+
+    def by_client(self, statuses=None, projects=None, clients=None):
+        return self._group('client', BILLED if statuses is None else statuses, projects, clients)
+
+    def _group(self, column, statuses, projects, clients):
+        self.refresh()
+        totals = defaultdict(int)
+        with self._lock:
+            mask = self._mask(statuses=statuses, projects=projects, clients=clients)
+            for key, amount in zip(self._select(column, mask), self._select('amount', mask)):
+                totals[key] += amount
+        return {key: to_money(total) for key, total in totals.items()}
+
+    def select(self, names, statuses=None, projects=None, clients=None):
+        """Lists of these columns' values for the matching rows, for callers doing their own math"""
+        self.refresh()
+        with self._lock:
+            mask = self._mask(statuses=statuses, projects=projects, clients=clients)
+            if mask is None:
+                return [list(self.columns[name]) for name in names]
+            return [list(compress(self.columns[name], mask)) for name in names]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rows': len(self._slots),
+                'projects': len(self._clients),
+                'cursor': self._cursor,
+                'refresh_interval': self.refresh_interval,
+                'reload_interval': self.reload_interval,
+                'refreshes': self.refreshes,
+                'reloads': self.reloads,
+                'bytes': sum(column.itemsize * len(column) for column in self.columns.values()),
+            }
+
+
+RECEIVABLES = ReceivablesCache(
+    refresh_interval=getattr(settings, 'RECEIVABLES_CACHE_REFRESH_SECONDS', 5),
+    reload_interval=getattr(settings, 'RECEIVABLES_CACHE_RELOAD_SECONDS', 3600),
+)
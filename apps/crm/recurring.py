@@ -0,0 +1,63 @@
+import heapq
+from datetime import timedelta
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .bulk import bulk_updated
+from .models import PaymentInstallment, RecurringPaymentPlan
+
+
+def materialize_plans(days=None, today=None):
+    """
+    Store every active plan's occurrences due within `days` of today as
+    PaymentInstallment rows (one bulk_create), and move each plan's
+    materialized_through cursor to the horizon. Occurrences already stored
+    are never generated again. Returns (plans, installments created).
+    """
+    today = today or timezone.now().date()
+    horizon = today + timedelta(days=settings.RECURRING_PAYMENT_HORIZON_DAYS if days is None else days)
+
+    with transaction.atomic():
+        # Locked so two overlapping runs can't both materialize the same window
+        plans = list(
+            RecurringPaymentPlan.objects.select_for_update()
+            .filter(is_active=True, start_date__lte=horizon)
+            .exclude(materialized_through__gte=horizon)
+        )
+        installments = [
+            installment for plan in plans for installment in plan.virtual_installments(end=horizon)
+        ]
+        created = PaymentInstallment.objects.bulk_create(installments)
+
+        now = timezone.now()
+        for plan in plans:
+            plan.materialized_through = horizon
+            plan.updated_at = now
+        RecurringPaymentPlan.objects.bulk_update(plans, ['materialized_through', 'updated_at'])
+
+        if created:
+            bulk_updated.send(
+                sender=PaymentInstallment,
+                pks=[installment.pk for installment in created],
+                project_ids={plan.project_id for plan in plans},
+            )
+    return len(plans), len(created)
+
+
+def upcoming_occurrences(start=None, end=None, plans=None):
+    """
+    Lazily yield unsaved installments for plan occurrences that are not
+    stored yet, due in [start, end], in due date order across all plans.
+    Dashboards and forecasts combine these with the stored installments.
+    """
+    if plans is None:
+        plans = RecurringPaymentPlan.objects.filter(is_active=True).select_related('project__client')
+
+    def occurrences(plan):
+        for installment in plan.virtual_installments(start, end):
+            installment.project = plan.project
+            yield installment
+
+    return heapq.merge(*(occurrences(plan) for plan in plans), key=attrgetter('due_date'))
@@ -0,0 +1,139 @@
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from .bulk import bulk_updated
+from .cadence import due_dates
+from .ledger import CENT, BudgetExceeded, available_budget, lock_project_summary, parse_amount
+from .models import PaymentInstallment, ProjectTemplate
+
+
+SPLIT_STRATEGIES = ProjectTemplate.SPLIT_STRATEGY_CHOICES
+
+MAX_INSTALLMENTS = 120
+HUNDRED = Decimal('100')
+
+
+def split_total(total, weights):
+    """
+    Split total proportionally to weights, in whole cents. Each share is
+    rounded down and the leftover cents go to the last installment.
+    """
+    weight_sum = sum(weights)
+    shares = [(total * weight / weight_sum).quantize(CENT, rounding=ROUND_DOWN) for weight in weights]
+    shares[-1] += total - sum(shares)
+    return shares
+
+
+def _percent(value, name):
+    try:
+        percent = Decimal(str(value))
+    except ArithmeticError:
+        raise ValueError(f'{name} must be a number.')
+    if not percent.is_finite() or not 0 <= percent <= HUNDRED:
+        raise ValueError(f'{name} must be between 0 and 100.')
+    return percent
+
+
+def plan_schedule(total, strategy, start_date, cadence='monthly', count=None,
+                  advance_percent=None, final_percent=None, percentages=None):
+    """
+    [(payment_type, label, amount, due_date), ...] for the requested split.
+
+    equal: `count` equal installments.
+    milestones: an advance and a final payment (percent of total each) with
+        `count` equal milestone payments between them.
+    percentages: one installment per entry of `percentages` (summing to 100).
+
+    Raises ValueError on bad input.
+    """
+    total = parse_amount(total)
+
+    if strategy == 'equal':
+        if not count or count < 1:
+            raise ValueError('Number of installments must be at least 1.')
+        weights = [Decimal(1)] * count
+        parts = [('installment', f'Installment {index + 1} of {count}') for index in range(count)]
+    elif strategy == 'milestones':
+        count = count or 0
+        if count < 0:
+            raise ValueError('Number of milestones cannot be negative.')
+        advance = _percent(30 if advance_percent is None else advance_percent, 'Advance percent')
+        final = _percent(20 if final_percent is None else final_percent, 'Final percent')
+        middle = HUNDRED - advance - final
+        if middle < 0 or (middle > 0 and not count):
+            raise ValueError('Advance, milestones and final must add up to 100%.')
+        weights = [advance] + [middle / count] * count + [final] if count else [advance, final]
+        parts = [('advance', 'Advance')]
+        parts += [('milestone', f'Milestone {index + 1}') for index in range(count)]
+        parts += [('final', 'Final payment')]
+        # A 0% advance or final is simply left out
+        kept = [index for index, weight in enumerate(weights) if weight > 0]
+        weights, parts = [weights[index] for index in kept], [parts[index] for index in kept]
+    elif strategy == 'percentages':
+        if not percentages:
+            raise ValueError('Enter at least one percentage.')
+        weights = [_percent(value, 'Each percentage') for value in percentages]
+        if any(weight == 0 for weight in weights):
+            raise ValueError('Percentages must be greater than zero.')
+        if sum(weights) != HUNDRED:
+            raise ValueError(f'Percentages add up to {sum(weights)}%, not 100%.')
+        parts = [('installment', f'Installment {index + 1} of {len(weights)}') for index in range(len(weights))]
+    else:
+        raise ValueError(f'Unknown split strategy "{strategy}".')
+
+    if len(weights) > MAX_INSTALLMENTS:
+        raise ValueError(f'A schedule can have at most {MAX_INSTALLMENTS} installments.')
+
+    amounts = split_total(total, weights)
+    if any(amount <= 0 for amount in amounts):
+        raise ValueError('The total is too small to split into that many installments.')
+
+    dates = due_dates(start_date, cadence, len(amounts))
+    return [
+        (payment_type, label, amount, due_date)
+        for (payment_type, label), amount, due_date in zip(parts, amounts, dates)
+    ]
+
+
+def build_schedule(project, created_by, title='', notes='', **options):
+    """Unsaved PaymentInstallment objects for the schedule, see plan_schedule()"""
+    today = timezone.now().date()
+    prefix = f'{title} - ' if title else ''
+    return [
+        PaymentInstallment(
+            project=project,
+            title=f'{prefix}{label}',
+            amount=amount,
+            payment_type=payment_type,
+            due_date=due_date,
+            # bulk_create skips the pre_save handler that sets this
+            status='overdue' if due_date < today else 'pending',
+            notes=notes,
+            created_by=created_by,
+        )
+        for payment_type, label, amount, due_date in plan_schedule(**options)
+    ]
+
+
+def create_schedule(installments):
+    """
+    Check the whole series against the project's unbilled budget once, under
+    the ledger's project lock, and insert it with one bulk_create.
+    Raises BudgetExceeded; returns the saved installments.
+    """
+    if not installments:
+        return []
+    project_id = installments[0].project_id
+    total = sum(installment.amount for installment in installments)
+
+    with transaction.atomic():
+        summary = lock_project_summary(project_id)
+        available = available_budget(summary)
+        if total > available:
+            raise BudgetExceeded(total, available)
+        created = PaymentInstallment.objects.bulk_create(installments)
+        bulk_updated.send(
+            sender=PaymentInstallment, pks=[installment.pk for installment in created], project_ids=[project_id]
+        )
+    return created
@@ -0,0 +1,145 @@
+from bisect import bisect_left
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.utils import timezone
+from apps.payments.models import Payment
+from .bulk import bulk_updated
+from .models import ClientSegment, PaymentInstallment
+
+
+CENT = Decimal('0.01')
+SEGMENT_FIELDS = [
+    'recency_days', 'frequency', 'monetary', 'first_paid', 'last_paid',
+    'recency_score', 'frequency_score', 'monetary_score', 'rfm_score',
+    'lifetime_value', 'segment', 'computed_at',
+]
+
+
+def client_activity():
+    """
+    {client id: [frequency, monetary, first paid, last paid]} over paid
+    installments and money received on payments, one grouped query per
+    source combined with UNION ALL.
+    """
+    installments = (
+        PaymentInstallment.objects.filter(status='paid', paid_date__isnull=False)
+        .values(client_id=F('project__client_id'))
+        .annotate(frequency=Count('pk'), monetary=Sum('amount'), first=Min('paid_date'), last=Max('paid_date'))
+        .order_by()
+    )
+    payments = (
+        Payment.objects.filter(amount_paid__gt=0)
+        .values('client_id')
+        .annotate(frequency=Count('pk'), monetary=Sum('amount_paid'), first=Min('payment_date'), last=Max('payment_date'))
+        .order_by()
+    )
+
+    activity = {}
+    for row in installments.union(payments, all=True):
+        current = activity.get(row['client_id'])
+        if current is None:
+            activity[row['client_id']] = [row['frequency'], row['monetary'], row['first'], row['last']]
+        else:
+            current[0] += row['frequency']
+            current[1] += row['monetary']
+            current[2] = min(current[2], row['first'])
+            current[3] = max(current[3], row['last'])
+    return activity
+
+
+def quintile_scores(values, higher_is_better=True):
+    """1-5 score per value by quintile of `values`; equal values always share a score"""
+    ordered = sorted(values)
+    size = len(ordered)
+
+    def score(value):
+        quintile = 1 + bisect_left(ordered, value) * 5 // size
+        return quintile if higher_is_better else 6 - quintile
+
+    return list(map(score, values))
+
+
+def classify(recency, frequency, monetary):
+    """Segment name for a client's three scores, first matching rule wins"""
+    if recency >= 4 and frequency >= 4 and monetary >= 4:
+        return 'champions'
+    if recency >= 3 and frequency >= 4:
+        return 'loyal'
+    if recency >= 4 and frequency <= 2:
+        return 'new'
+    if recency <= 2 and frequency >= 3:
+        return 'at_risk'
+    if recency <= 2:
+        return 'hibernating'
+    return 'potential'
+
+
+def compute_client_segments(today=None):
+    """
+    Rebuild ClientSegment for every client that has paid anything and drop
+    the rows of clients that no longer have. Lifetime value is the total
+    received plus the yearly revenue rate (over at least one year of
+    tenure) for CLIENT_LIFETIME_YEARS more years, scaled by recency_score / 5
+    so lapsed clients aren't credited with much future revenue.
+    Returns the saved segments.
+    """
+    today = today or timezone.now().date()
+    now = timezone.now()
+    years = Decimal(getattr(settings, 'CLIENT_LIFETIME_YEARS', 3))
+
+    activity = client_activity()
+    client_ids = list(activity)
+    frequency, monetary, first_paid, last_paid = (
+        [activity[pk][index] for pk in client_ids] for index in range(4)
+    )
+    recency = [max((today - day).days, 0) for day in last_paid]
+
+    if client_ids:
+        recency_scores = quintile_scores(recency, higher_is_better=False)
+        frequency_scores = quintile_scores(frequency)
+        monetary_scores = quintile_scores(monetary)
+    else:
+        recency_scores = frequency_scores = monetary_scores = []
+
+    segments = []
+    for index, pk in enumerate(client_ids):
+        r, f, m = recency_scores[index], frequency_scores[index], monetary_scores[index]
+        tenure_days = max((today - first_paid[index]).days, 365)
+        yearly = monetary[index] * 365 / tenure_days
+        segments.append(ClientSegment(
+            client_id=pk,
+            recency_days=recency[index],
+            frequency=frequency[index],
+            monetary=monetary[index].quantize(CENT),
+            first_paid=first_paid[index],
+            last_paid=last_paid[index],
+            recency_score=r,
+            frequency_score=f,
+            monetary_score=m,
+            rfm_score=r + f + m,
+            lifetime_value=(monetary[index] + yearly * years * r / 5).quantize(CENT),
+            segment=classify(r, f, m),
+            computed_at=now,
+        ))
+
+    with transaction.atomic():
+        ClientSegment.objects.bulk_create(
+            segments,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['client'],
+            update_fields=SEGMENT_FIELDS,
+        )
+        # Every row still there was written this run, older ones belong to clients with nothing paid now
+        ClientSegment.objects.filter(computed_at__lt=now).delete()
+        bulk_updated.send(sender=ClientSegment, pks=client_ids)
+    return segments
+
+
+def segment_counts(segments):
+    counts = Counter(segment.segment for segment in segments)
+    return [(label, counts[value]) for value, label in ClientSegment.SEGMENT_CHOICES]
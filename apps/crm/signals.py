@@ -1,7 +1,16 @@
-from django.db.models.signals import pre_save, post_save
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import PaymentInstallment
+from apps.clients.models import Client
+from apps.projects.models import Project, ProjectRequirement
+from apps.payments.models import Payment
+from .aging import invalidate_aging
+from .bulk import bulk_updated
+from .models import PaymentInstallment, DeletionTombstone
+from .progress import adjust_requirement_counts, recount_requirements
+from .receivables import RECEIVABLES
+from .summaries import refresh_client_summaries, refresh_project_summaries
 
 
 @receiver(pre_save, sender=PaymentInstallment)
@@ -29,3 +38,136 @@ def log_payment_status_change(sender, instance, created, **kwargs):
         print(f"Created payment installment: {instance.title} - Status: {instance.status}")
     else:
         print(f"Updated payment installment: {instance.title} - Status: {instance.status}")
+
+
+def _tombstone_owner(instance):
+    """User id the API scoped this object to (see apps.api.views get_queryset)"""
+    if hasattr(instance, 'assigned_to_id'):
+        return instance.assigned_to_id
+    try:
+        return instance.project.assigned_to_id
+    except Project.DoesNotExist:
+        return None
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=ProjectRequirement)
+@receiver(post_delete, sender=Payment)
+def record_deletion(sender, instance, **kwargs):
+    """Leave a tombstone so delta sync consumers can propagate deletes"""
+    DeletionTombstone.objects.create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        owner_id=_tombstone_owner(instance),
+    )
+
+
+@receiver(pre_save, sender=PaymentInstallment)
+@receiver(pre_save, sender=Project)
+def remember_previous_owner_row(sender, instance, **kwargs):
+    """Keep the project/client an existing row belonged to, its summary changes too"""
+    if instance.pk is None:
+        return
+    field = 'project_id' if sender is PaymentInstallment else 'client_id'
+    instance._previous_summary_parent = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=PaymentInstallment)
+def update_project_summary(sender, instance, **kwargs):
+    """Recompute the project's (and client's) financial summary in the same transaction"""
+    refresh_project_summaries({instance.project_id, getattr(instance, '_previous_summary_parent', None)})
+
+
+@receiver(post_delete, sender=PaymentInstallment)
+def update_project_summary_after_delete(sender, instance, **kwargs):
+    # After commit: during a project/client cascade the summary rows are going away too
+    transaction.on_commit(lambda: refresh_project_summaries([instance.project_id]))
+
+
+@receiver(post_save, sender=Project)
+def update_summary_for_project(sender, instance, **kwargs):
+    """Budget edits change remaining_budget, client moves change two client totals"""
+    refresh_project_summaries([instance.pk])
+    previous_client = getattr(instance, '_previous_summary_parent', None)
+    if previous_client and previous_client != instance.client_id:
+        refresh_client_summaries([previous_client])
+
+
+@receiver(post_delete, sender=Project)
+def update_client_summary_after_project_delete(sender, instance, **kwargs):
+    transaction.on_commit(lambda: refresh_client_summaries([instance.client_id]))
+
+
+@receiver(bulk_updated, sender=PaymentInstallment)
+def update_summaries_after_bulk(sender, pks, project_ids=None, **kwargs):
+    """One refresh per affected project for a whole set-based update"""
+    if project_ids is None:
+        project_ids = PaymentInstallment.objects.filter(pk__in=pks).values_list('project_id', flat=True).distinct()
+    refresh_project_summaries(project_ids)
+
+
+@receiver(bulk_updated, sender=Project)
+def update_summaries_after_project_bulk(sender, pks, **kwargs):
+    refresh_project_summaries(pks)
+
+
+@receiver(post_save, sender=PaymentInstallment)
+@receiver(post_delete, sender=PaymentInstallment)
+@receiver(bulk_updated, sender=PaymentInstallment)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def mark_receivables_stale(sender, **kwargs):
+    """This worker's snapshot catches up on its next read; other workers within the refresh interval"""
+    transaction.on_commit(RECEIVABLES.mark_stale)
+
+
+@receiver(post_save, sender=PaymentInstallment)
+@receiver(post_delete, sender=PaymentInstallment)
+@receiver(bulk_updated, sender=PaymentInstallment)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(bulk_updated, sender=Project)
+def invalidate_aging_report(sender, **kwargs):
+    transaction.on_commit(invalidate_aging)
+
+
+@receiver(pre_save, sender=ProjectRequirement)
+def remember_previous_requirement_state(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    instance._previous_counter_state = sender.objects.filter(pk=instance.pk).values_list(
+        'project_id', 'is_completed'
+    ).first()
+
+
+@receiver(post_save, sender=ProjectRequirement)
+def update_requirement_counts(sender, instance, created, **kwargs):
+    """Shift the project's requirement counters by what this save changed"""
+    done = int(bool(instance.is_completed))
+    previous = None if created else getattr(instance, '_previous_counter_state', None)
+    if previous is None:
+        adjust_requirement_counts(instance.project_id, total=1, done=done)
+        return
+    
+    previous_project, previous_done = previous[0], int(previous[1])
+    if previous_project != instance.project_id:
+        adjust_requirement_counts(previous_project, total=-1, done=-previous_done)
+        adjust_requirement_counts(instance.project_id, total=1, done=done)
+    else:
+        adjust_requirement_counts(instance.project_id, done=done - previous_done)
+
+
+@receiver(post_delete, sender=ProjectRequirement)
+def update_requirement_counts_after_delete(sender, instance, **kwargs):
+    # During a project cascade this updates a row that is about to go, which is harmless
+    adjust_requirement_counts(instance.project_id, total=-1, done=-int(bool(instance.is_completed)))
+
+
+@receiver(bulk_updated, sender=ProjectRequirement)
+def recount_requirements_after_bulk(sender, pks, project_ids=None, **kwargs):
+    if project_ids is None:
+        project_ids = ProjectRequirement.objects.filter(pk__in=pks).values_list('project_id', flat=True).distinct()
+    recount_requirements(project_ids)
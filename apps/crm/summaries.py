@@ -0,0 +1,148 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.clients.models import Client
+from apps.projects.models import Project
+from .models import ClientFinancialSummary, PaymentInstallment, ProjectFinancialSummary
+
+
+ZERO = Decimal('0.00')
+TOTAL_FIELDS = ['total_billed', 'total_paid', 'total_pending', 'total_overdue']
+SUMMARY_FIELDS = TOTAL_FIELDS + ['remaining_budget']
+
+
+def _money(expression):
+    return Coalesce(expression, Value(ZERO), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def installment_totals(today=None):
+    """
+    Conditional sums over PaymentInstallment.amount, usable in aggregate() or
+    annotate(). Pending and overdue split on the due date, the rule of
+    PaymentInstallment.objects.with_overdue(), not on the stored status.
+    """
+    today = today or timezone.now().date()
+    outstanding = Q(status__in=['pending', 'overdue'])
+    return {
+        'total_billed': _money(Sum('amount', filter=~Q(status='cancelled'))),
+        'total_paid': _money(Sum('amount', filter=Q(status='paid'))),
+        'total_pending': _money(Sum('amount', filter=outstanding & Q(due_date__gte=today))),
+        'total_overdue': _money(Sum('amount', filter=outstanding & Q(due_date__lt=today))),
+    }
+
+
+def refresh_project_summaries(project_ids, today=None):
+    """
+    Recompute the summary rows of these projects with one grouped query
+    over their installments, upsert them, then roll their clients up.
+    Ids of projects that no longer exist are ignored.
+    """
+    project_ids = set(project_ids) - {None}
+    if not project_ids:
+        return
+
+    with transaction.atomic():
+        projects = {
+            pk: (budget, client_id)
+            for pk, budget, client_id in Project.objects.filter(pk__in=project_ids).values_list('pk', 'budget', 'client_id')
+        }
+        totals = {
+            row.pop('project_id'): row
+            for row in PaymentInstallment.objects.filter(project_id__in=list(projects))
+            .values('project_id').annotate(**installment_totals(today)).order_by()
+        }
+
+        summaries = []
+        for pk, (budget, _) in projects.items():
+            values = totals.get(pk) or dict.fromkeys(TOTAL_FIELDS, ZERO)
+            summaries.append(ProjectFinancialSummary(
+                project_id=pk,
+                remaining_budget=(budget or ZERO) - values['total_paid'],
+                **values
+            ))
+        _upsert(ProjectFinancialSummary, summaries, 'project')
+
+        refresh_client_summaries({client_id for _, client_id in projects.values()})
+
+
+def refresh_client_summaries(client_ids):
+    """Client rows are the sum of their projects' summary rows."""
+    client_ids = set(client_ids) - {None}
+    if not client_ids:
+        return
+
+    with transaction.atomic():
+        existing = set(Client.objects.filter(pk__in=client_ids).values_list('pk', flat=True))
+        # Lock the client rows before summing: a concurrent writer to another
+        # project of the same client waits here, then sums with this
+        # transaction's project rows committed instead of missing them
+        ClientFinancialSummary.objects.bulk_create(
+            [ClientFinancialSummary(client_id=pk) for pk in existing], ignore_conflicts=True
+        )
+        list(
+            ClientFinancialSummary.objects.filter(client_id__in=existing)
+            .select_for_update().order_by('pk').values_list('pk', flat=True)
+        )
+        totals = {
+            row.pop('project__client_id'): row
+            for row in ProjectFinancialSummary.objects.filter(project__client_id__in=existing)
+            .values('project__client_id')
+            .annotate(**{name: _money(Sum(name)) for name in SUMMARY_FIELDS}).order_by()
+        }
+        _upsert(ClientFinancialSummary, [
+            ClientFinancialSummary(client_id=pk, **(totals.get(pk) or dict.fromkeys(SUMMARY_FIELDS, ZERO)))
+            for pk in existing
+        ], 'client')
+
+
+def rebuild_summaries(batch_size=500):
+    """Recompute every project and client summary, returns (projects, clients)."""
+    project_ids = list(Project.objects.values_list('pk', flat=True))
+    for start in range(0, len(project_ids), batch_size):
+        refresh_project_summaries(project_ids[start:start + batch_size])
+    # Clients without projects still get an all-zero row
+    client_ids = list(Client.objects.filter(financial_summary__isnull=True).values_list('pk', flat=True))
+    for start in range(0, len(client_ids), batch_size):
+        refresh_client_summaries(client_ids[start:start + batch_size])
+    return len(project_ids), ClientFinancialSummary.objects.count()
+
+
+def refresh_past_due_summaries(today=None):
+    """
+    Refresh the projects with an outstanding installment that has fallen
+    past due since their summary was last written, so its amount moves
+    from total_pending to total_overdue without any write to it. Meant to
+    run daily (mark_overdue_payments does); returns how many projects.
+    """
+    today = today or timezone.now().date()
+    project_ids = set(
+        PaymentInstallment.objects.filter(
+            status__in=['pending', 'overdue'],
+            due_date__lt=today,
+            due_date__gte=F('project__financial_summary__updated_at__date'),
+        ).values_list('project_id', flat=True).distinct()
+    )
+    refresh_project_summaries(project_ids, today)
+    return len(project_ids)
+
+
+def project_summary(project):
+    """The project's summary row, built on first use for projects saved before summaries existed."""
+    try:
+        return project.financial_summary
+    except ProjectFinancialSummary.DoesNotExist:
+        refresh_project_summaries([project.pk])
+        return ProjectFinancialSummary.objects.get(pk=project.pk)
+
+
+def _upsert(model, rows, key):
+    # INSERT ... ON CONFLICT DO UPDATE, one statement per batch
+    model.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=[key],
+        update_fields=SUMMARY_FIELDS + ['updated_at'],
+    )
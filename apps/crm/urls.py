@@ -12,6 +12,8 @@ urlpatterns = [
     # Project URLs
     path('projects/', views.project_list, name='project_list'),
     path('projects/create/', views.project_create, name='project_create'),
+    path('projects/from-template/', views.project_create_from_template, name='project_create_from_template'),
+    path('projects/bulk/', views.project_bulk_action, name='project_bulk_action'),
     path('projects/<int:project_id>/', views.project_detail, name='project_detail'),
     path('projects/<int:project_id>/edit/', views.project_edit, name='project_edit'),
     path('projects/<int:project_id>/requirements/add/', views.requirement_add, name='requirement_add'),
@@ -34,12 +36,18 @@ urlpatterns = [
     # Payment Installments
     path('payments/', views.payment_installment_list, name='payment_installment_list'),
     path('payments/create/', views.payment_installment_create, name='payment_installment_create'),
+    path('payments/schedule/', views.payment_installment_schedule, name='payment_installment_schedule'),
+    path('payments/mark-paid/', views.payment_installment_bulk_mark_paid, name='payment_installment_bulk_mark_paid'),
     path('payments/<int:installment_id>/edit/', views.payment_installment_edit, name='payment_installment_edit'),
     path('payments/<int:installment_id>/mark-paid/', views.payment_installment_mark_paid, name='payment_installment_mark_paid'),
     path('payments/<int:installment_id>/delete/', views.payment_installment_delete, name='payment_installment_delete'),
     path('project/<int:project_id>/financial-data/', views.get_project_financial_data, name='get_project_financial_data'),
     path('debug/payments/', views.debug_payments, name='debug_payments'),
     
+    # Reports
+    path('reports/aging/', views.ar_aging_report, name='ar_aging_report'),
+    path('reports/cash-flow/', views.cash_flow_forecast_report, name='cash_flow_forecast'),
+    
     # Dashboard
     path('dashboard/', views.dashboard_view, name='dashboard'),
 ]
@@ -1,14 +1,34 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Sum
+from django.db.models import Count, F, Q, Sum
 from django.http import JsonResponse
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.http import url_has_allowed_host_and_scheme
+import heapq
+from itertools import islice
+from operator import attrgetter
 from apps.clients.models import Client, ClientContact
 from apps.projects.models import Project, ProjectRequirement
-from .models import CustomSMTPConfig, EmailLog, PaymentInstallment
+from .models import ClientSegment, CustomSMTPConfig, EmailLog, PaymentInstallment, ProjectTemplate
+from .summaries import project_summary
+from .ledger import BudgetExceeded, available_budget, create_installment, parse_amount, update_installment
+from .cadence import CADENCES, add_months
+from .schedules import SPLIT_STRATEGIES, build_schedule, create_schedule
+from .recurring import upcoming_occurrences
+from .receivables import RECEIVABLES
+from .aging import AGING_BUCKETS, BUCKET_KEYS, aging_report
+from .forecast import cash_flow_forecast
+from .project_templates import instantiate_template
+from .bulk import PROJECT_BULK_ACTIONS, BulkActionError, bulk_mark_installments_paid, bulk_update_projects
+
+
+CLIENT_SORTS = {
+    'ltv': ('Highest lifetime value', 'segment__lifetime_value'),
+    'rfm': ('Highest RFM score', 'segment__rfm_score'),
+}
 
 
 @login_required
@@ -17,7 +37,7 @@ def client_list(request):
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     
-    clients = Client.objects.all()
+    clients = Client.objects.select_related('segment')
     
     # Apply search filter
     if search_query:
@@ -31,6 +51,14 @@ def client_list(request):
     if status_filter:
         clients = clients.filter(status=status_filter)
     
+    # RFM segment filter and value sort, on the table compute_client_segments fills
+    segment_filter = request.GET.get('segment', '')
+    if segment_filter in dict(ClientSegment.SEGMENT_CHOICES):
+        clients = clients.filter(segment__segment=segment_filter)
+    sort = request.GET.get('sort', '')
+    if sort in CLIENT_SORTS:
+        clients = clients.order_by(F(CLIENT_SORTS[sort][1]).desc(nulls_last=True), '-created_at')
+    
     # Pagination
     paginator = Paginator(clients, 10)
     page_number = request.GET.get('page')
@@ -41,6 +69,10 @@ def client_list(request):
         'clients': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
+        'segment_filter': segment_filter,
+        'segment_choices': ClientSegment.SEGMENT_CHOICES,
+        'sort': sort,
+        'sorts': [(value, label) for value, (label, _) in CLIENT_SORTS.items()],
     }
     return render(request, 'crm/clients/client_list.html', context)
 
@@ -88,6 +120,13 @@ def client_create(request):
     return render(request, 'crm/clients/client_form.html', context)
 
 
+PROJECT_PROGRESS_FILTERS = {
+    'not_started': ('No requirements done', Q(requirement_progress=0)),
+    'in_progress': ('Partly done', Q(requirement_progress__gt=0, requirement_progress__lt=100)),
+    'done': ('All requirements done', Q(requirement_progress=100)),
+}
+
+
 @login_required
 def project_list(request):
     """Display list of projects"""
@@ -108,6 +147,14 @@ def project_list(request):
     if status_filter:
         projects = projects.filter(status=status_filter)
     
+    # Requirement progress filter and sort, on the maintained counter column
+    progress_filter = request.GET.get('progress', '')
+    if progress_filter in PROJECT_PROGRESS_FILTERS:
+        projects = projects.filter(PROJECT_PROGRESS_FILTERS[progress_filter][1])
+    sort = request.GET.get('sort', '')
+    if sort in ('progress', '-progress'):
+        projects = projects.order_by(sort.replace('progress', 'requirement_progress'), '-created_at')
+    
     # Pagination
     paginator = Paginator(projects, 10)
     page_number = request.GET.get('page')
@@ -118,10 +165,44 @@ def project_list(request):
         'projects': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
+        'progress_filter': progress_filter,
+        'progress_filters': [(value, label) for value, (label, _) in PROJECT_PROGRESS_FILTERS.items()],
+        'sort': sort,
+        'bulk_actions': PROJECT_BULK_ACTIONS,
+        'status_choices': Project.STATUS_CHOICES,
+        'users': User.objects.filter(is_active=True).only('id', 'username').order_by('username'),
     }
     return render(request, 'crm/projects/project_list.html', context)
 
 
+@login_required
+def project_bulk_action(request):
+    """Complete, re-status or reassign the selected projects in one update"""
+    if request.method != 'POST':
+        return redirect('crm:project_list')
+    
+    # Back to the same filtered/paginated list
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = 'crm:project_list'
+    
+    ids = [pk for pk in request.POST.getlist('project_ids') if pk.isdigit()]
+    if not ids:
+        messages.error(request, 'Select at least one project.')
+        return redirect(next_url)
+    
+    action = request.POST.get('action')
+    value = request.POST.get('assigned_to') if action == 'reassign' else request.POST.get('status')
+    try:
+        updated = bulk_update_projects(Project.objects.filter(pk__in=ids), action, value)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect(next_url)
+    
+    messages.success(request, f'{len(updated)} project(s) updated.')
+    return redirect(next_url)
+
+
 @login_required
 def project_detail(request, project_id):
     """Display project details"""
@@ -176,6 +257,50 @@ def project_create(request):
     return render(request, 'crm/projects/project_form.html', context)
 
 
+@login_required
+def project_create_from_template(request):
+    """Create a project with its requirements and installments from a template"""
+    templates = ProjectTemplate.objects.filter(is_active=True).annotate(requirement_count=Count('requirements'))
+    context = {
+        'segment': 'projects',
+        'templates': templates,
+        'clients': Client.objects.all(),
+        'form': request.POST,
+    }
+    
+    if request.method == 'POST':
+        try:
+            from datetime import datetime
+            template = templates.get(id=request.POST.get('template'))
+            client = Client.objects.get(id=request.POST.get('client'))
+            start_date = datetime.strptime(request.POST.get('start_date', ''), '%Y-%m-%d').date()
+            budget = request.POST.get('budget')
+            
+            project = instantiate_template(
+                template,
+                client,
+                request.user,
+                title=request.POST.get('title') or template.name,
+                start_date=start_date,
+                budget=parse_amount(budget) if budget else None,
+            )
+            messages.success(
+                request,
+                f'Project "{project.title}" created from template "{template.name}" '
+                f'with {template.requirement_count} requirements.'
+            )
+            return redirect('crm:project_detail', project_id=project.id)
+            
+        except ProjectTemplate.DoesNotExist:
+            messages.error(request, 'Please select a template.')
+        except Client.DoesNotExist:
+            messages.error(request, 'Please select a client.')
+        except ValueError as e:
+            messages.error(request, f'Failed to create project: {str(e)}')
+    
+    return render(request, 'crm/projects/project_template_form.html', context)
+
+
 @login_required
 def project_edit(request, project_id):
     """Edit existing project"""
@@ -285,7 +410,7 @@ def test_email_view(request):
 @login_required
 def payment_installment_list(request):
     """List all payment installments"""
-    installments = PaymentInstallment.objects.select_related('project', 'project__client').order_by('-due_date')
+    installments = PaymentInstallment.objects.with_overdue().select_related('project', 'project__client')
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
@@ -297,6 +422,15 @@ def payment_installment_list(request):
     if project_filter:
         installments = installments.filter(project_id=project_filter)
     
+    # ?overdue=1 and ?sort=days_overdue run on the with_overdue() annotations
+    if request.GET.get('overdue'):
+        installments = installments.filter(is_overdue=True)
+    
+    if request.GET.get('sort') == 'days_overdue':
+        installments = installments.order_by('-days_overdue', 'due_date')
+    else:
+        installments = installments.order_by('-due_date')
+    
     context = {
         'segment': 'payment_installments',
         'installments': installments,
@@ -307,6 +441,21 @@ def payment_installment_list(request):
     return render(request, 'crm/payments/installment_list.html', context)
 
 
+def _installment_form_context(project, amount):
+    """Form context for re-rendering a rejected installment"""
+    summary = project_summary(project)
+    return {
+        'segment': 'payment_installments',
+        'projects': Project.objects.all(),
+        'payment_types': PaymentInstallment.PAYMENT_TYPE_CHOICES,
+        'selected_project': project,
+        'project_budget': project.budget or 0,
+        'total_paid': summary.total_paid,
+        'remaining_amount': summary.remaining_budget,
+        'entered_amount': amount,
+    }
+
+
 @login_required
 def payment_installment_create(request):
     """Create new payment installment with smart validation"""
@@ -314,35 +463,12 @@ def payment_installment_create(request):
         try:
             project_id = request.POST.get('project')
             title = request.POST.get('title')
-            amount = float(request.POST.get('amount'))
+            amount = parse_amount(request.POST.get('amount'))
             payment_type = request.POST.get('payment_type')
             due_date = request.POST.get('due_date')
             notes = request.POST.get('notes', '')
             
-            project = Project.objects.get(id=project_id)
-            
-            # Calculate remaining amount
-            total_paid = PaymentInstallment.objects.filter(
-                project=project, 
-                status='paid'
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            remaining_amount = (project.budget or 0) - total_paid
-            
-            # Validate amount doesn't exceed remaining budget
-            if amount > remaining_amount:
-                messages.error(request, f'Amount ₹{amount} exceeds remaining budget ₹{remaining_amount}. Please enter a smaller amount.')
-                context = {
-                    'segment': 'payment_installments',
-                    'projects': Project.objects.all(),
-                    'payment_types': PaymentInstallment.PAYMENT_TYPE_CHOICES,
-                    'selected_project': project,
-                    'project_budget': project.budget or 0,
-                    'total_paid': total_paid,
-                    'remaining_amount': remaining_amount,
-                    'entered_amount': amount,
-                }
-                return render(request, 'crm/payments/installment_form.html', context)
+            project = Project.objects.select_related('financial_summary').get(id=project_id)
             
             # Convert due_date string to date object
             from datetime import datetime
@@ -352,27 +478,22 @@ def payment_installment_create(request):
                     due_date_obj = datetime.strptime(due_date, '%Y-%m-%d').date()
                 except ValueError:
                     messages.error(request, 'Invalid due date format. Please use YYYY-MM-DD format.')
-                    context = {
-                        'segment': 'payment_installments',
-                        'projects': Project.objects.all(),
-                        'payment_types': PaymentInstallment.PAYMENT_TYPE_CHOICES,
-                        'selected_project': project,
-                        'project_budget': project.budget or 0,
-                        'total_paid': total_paid,
-                        'remaining_amount': remaining_amount,
-                        'entered_amount': amount,
-                    }
-                    return render(request, 'crm/payments/installment_form.html', context)
+                    return render(request, 'crm/payments/installment_form.html', _installment_form_context(project, amount))
             
-            installment = PaymentInstallment.objects.create(
-                project_id=project_id,
-                title=title,
-                amount=amount,
-                payment_type=payment_type,
-                due_date=due_date_obj,
-                notes=notes,
-                created_by=request.user
-            )
+            # The budget check and the insert run under the project's row lock
+            try:
+                installment = create_installment(
+                    project.pk,
+                    amount=amount,
+                    created_by=request.user,
+                    title=title,
+                    payment_type=payment_type,
+                    due_date=due_date_obj,
+                    notes=notes,
+                )
+            except BudgetExceeded as e:
+                messages.error(request, str(e))
+                return render(request, 'crm/payments/installment_form.html', _installment_form_context(project, amount))
             
             messages.success(request, f'Payment installment "{installment.title}" created successfully!')
             return redirect('crm:payment_installment_list')
@@ -398,25 +519,86 @@ def payment_installment_create(request):
     return render(request, 'crm/payments/installment_form.html', context)
 
 
+@login_required
+def payment_installment_schedule(request):
+    """Generate a whole payment plan at once; "Preview" shows it, "Create" saves it"""
+    selected_project_id = request.POST.get('project') or request.GET.get('project')
+    context = {
+        'segment': 'payment_installments',
+        'projects': Project.objects.select_related('client'),
+        'strategies': SPLIT_STRATEGIES,
+        'cadences': CADENCES,
+        'selected_project_id': selected_project_id,
+        'form': request.POST,
+    }
+    
+    if request.method == 'POST':
+        try:
+            from datetime import datetime
+            project = Project.objects.select_related('financial_summary').get(id=selected_project_id)
+            strategy = request.POST.get('strategy')
+            installments = build_schedule(
+                project,
+                request.user,
+                title=request.POST.get('title', ''),
+                notes=request.POST.get('notes', ''),
+                total=request.POST.get('total'),
+                strategy=strategy,
+                cadence=request.POST.get('cadence'),
+                start_date=datetime.strptime(request.POST.get('start_date', ''), '%Y-%m-%d').date(),
+                count=int(request.POST.get('count') or 0),
+                advance_percent=request.POST.get('advance_percent') or None,
+                final_percent=request.POST.get('final_percent') or None,
+                percentages=[value for value in request.POST.get('percentages', '').replace(',', ' ').split()],
+            )
+            
+            if 'create' in request.POST:
+                created = create_schedule(installments)
+                messages.success(request, f'Created {len(created)} payment installments for "{project.title}".')
+                return redirect('crm:payment_installment_list')
+            
+            total = sum(installment.amount for installment in installments)
+            available = available_budget(project_summary(project))
+            context.update({
+                'preview': installments,
+                'preview_total': total,
+                'available_budget': available,
+                'within_budget': total <= available,
+            })
+            
+        except Project.DoesNotExist:
+            messages.error(request, 'Please select a project.')
+        except BudgetExceeded as e:
+            messages.error(request, str(e))
+        except ValueError as e:
+            messages.error(request, f'Invalid schedule: {str(e)}')
+    
+    return render(request, 'crm/payments/installment_schedule.html', context)
+
+
 @login_required
 def get_project_financial_data(request, project_id):
     """Get project financial data for AJAX requests"""
     try:
-        project = Project.objects.get(id=project_id)
+        project = Project.objects.select_related('financial_summary').get(id=project_id)
+        summary = project_summary(project)
         
-        # Calculate financial data
-        total_paid = PaymentInstallment.objects.filter(
-            project=project, 
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        remaining_amount = (project.budget or 0) - total_paid
+        # Pending and overdue installments are already spoken for
+        max_amount = available_budget(summary)
+        installment_id = request.GET.get('installment')
+        if installment_id:
+            # When editing, the installment's own amount is available to it
+            max_amount += PaymentInstallment.objects.filter(
+                id=installment_id, project_id=project.pk
+            ).exclude(status='cancelled').aggregate(amount=Sum('amount'))['amount'] or 0
         
         data = {
             'budget': float(project.budget or 0),
-            'total_paid': float(total_paid),
-            'remaining_amount': float(remaining_amount),
-            'max_amount': float(remaining_amount),
+            'total_paid': float(summary.total_paid),
+            'total_pending': float(summary.total_pending),
+            'total_overdue': float(summary.total_overdue),
+            'remaining_amount': float(summary.remaining_budget),
+            'max_amount': float(max(max_amount, 0)),
         }
         
         return JsonResponse(data)
@@ -434,9 +616,9 @@ def payment_installment_edit(request, installment_id):
     
     if request.method == 'POST':
         try:
-            installment.project_id = request.POST.get('project')
+            project_id = request.POST.get('project')
+            amount = parse_amount(request.POST.get('amount'))
             installment.title = request.POST.get('title')
-            installment.amount = float(request.POST.get('amount'))
             installment.payment_type = request.POST.get('payment_type')
             
             # Convert due_date string to date object
@@ -456,7 +638,17 @@ def payment_installment_edit(request, installment_id):
                     return render(request, 'crm/payments/installment_form.html', context)
             
             installment.notes = request.POST.get('notes')
-            installment.save()
+            try:
+                update_installment(installment, amount=amount, project_id=project_id)
+            except BudgetExceeded as e:
+                messages.error(request, str(e))
+                context = {
+                    'segment': 'payment_installments',
+                    'installment': installment,
+                    'projects': Project.objects.all(),
+                    'payment_types': PaymentInstallment.PAYMENT_TYPE_CHOICES,
+                }
+                return render(request, 'crm/payments/installment_form.html', context)
             
             messages.success(request, f'Payment installment "{installment.title}" updated successfully!')
             return redirect('crm:payment_installment_list')
@@ -517,6 +709,82 @@ def payment_installment_mark_paid(request, installment_id):
     return render(request, 'crm/payments/mark_paid_form.html', context)
 
 
+@login_required
+def payment_installment_bulk_mark_paid(request):
+    """Mark the selected installments paid on one date"""
+    if request.method != 'POST':
+        return redirect('crm:payment_installment_list')
+    
+    ids = [int(pk) for pk in request.POST.getlist('installment_ids') if pk.isdigit()]
+    if not ids:
+        messages.error(request, 'Select at least one installment.')
+        return redirect('crm:payment_installment_list')
+    
+    paid_date_str = request.POST.get('paid_date')
+    if not paid_date_str:
+        paid_date = timezone.now().date()
+    else:
+        from datetime import datetime
+        try:
+            paid_date = datetime.strptime(paid_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            messages.error(request, 'Invalid paid date format. Please use YYYY-MM-DD format.')
+            return redirect('crm:payment_installment_list')
+    
+    try:
+        updated = bulk_mark_installments_paid(PaymentInstallment.objects.all(), dict.fromkeys(ids, paid_date))
+    except BulkActionError as e:
+        messages.error(request, f'Nothing was marked paid. {e}')
+        return redirect('crm:payment_installment_list')
+    
+    messages.success(request, f'{len(updated)} installment(s) marked as paid on {paid_date:%b %d, %Y}.')
+    return redirect('crm:payment_installment_list')
+
+
+@login_required
+def ar_aging_report(request):
+    """Open installment and payment amounts by days past due, per project or per client"""
+    group = 'client' if request.GET.get('group') == 'client' else 'project'
+    report = aging_report()
+    
+    # Templates can't index by bucket key, so hand them the amounts in column order
+    context = {
+        'segment': 'ar_aging',
+        'group': group,
+        'buckets': AGING_BUCKETS,
+        'rows': [
+            (row, [row[key] for key in BUCKET_KEYS])
+            for row in report['clients' if group == 'client' else 'projects']
+        ],
+        'totals': [report['totals'][key] for key in BUCKET_KEYS],
+        'grand_total': report['totals']['total'],
+        'as_of': report['as_of'],
+    }
+    return render(request, 'crm/reports/aging.html', context)
+
+
+@login_required
+def cash_flow_forecast_report(request):
+    """Weekly expected inflows with confidence bands for the next few months"""
+    try:
+        months = min(max(int(request.GET.get('months', 3)), 1), 24)
+    except ValueError:
+        months = 3
+    forecast = cash_flow_forecast(months)
+    
+    context = {
+        'segment': 'cash_flow',
+        'months': months,
+        'month_choices': [1, 3, 6, 12],
+        'forecast': forecast,
+        'week_labels': [row['week_start'].strftime('%d %b') for row in forecast['weeks']],
+        'expected_data': [float(row['expected']) for row in forecast['weeks']],
+        'low_data': [float(row['low']) for row in forecast['weeks']],
+        'high_data': [float(row['high']) for row in forecast['weeks']],
+    }
+    return render(request, 'crm/reports/cash_flow.html', context)
+
+
 @login_required
 def debug_payments(request):
     """Debug view to check payment installments in database"""
@@ -563,39 +831,12 @@ def payment_installment_delete(request, installment_id):
 def get_dashboard_stats():
     """Get dashboard statistics including total income from all paid installments"""
     from django.utils import timezone
-    from django.db.models import Sum, Count, Q
-    from datetime import datetime, timedelta
     
     today = timezone.now().date()
-    current_month_start = today.replace(day=1)
-    current_month_end = (current_month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
     
-    # Debug: Check all payment installments
-    all_installments = PaymentInstallment.objects.all()
-    paid_installments = PaymentInstallment.objects.filter(status='paid')
-    
-    # Total income from ALL paid installments (not just monthly)
-    total_income = paid_installments.aggregate(total=Sum('amount'))['total'] or 0
-    
-    # Monthly income from paid installments
-    monthly_income = PaymentInstallment.objects.filter(
-        status='paid',
-        paid_date__gte=current_month_start,
-        paid_date__lte=current_month_end
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    # Total pending payments
-    pending_payments = PaymentInstallment.objects.filter(status='pending').aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-    
-    # Overdue payments
-    overdue_payments = PaymentInstallment.objects.filter(
-        Q(status='pending') & Q(due_date__lt=today)
-    ).aggregate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
+    # Installment figures come from this worker's snapshot, not a query each
+    totals = RECEIVABLES.totals(today)
+    [(_, monthly_income)] = RECEIVABLES.monthly(today, today)
     
     # Project statistics
     total_projects = Project.objects.count()
@@ -608,18 +849,12 @@ def get_dashboard_stats():
         projects__status__in=['in_progress', 'on_hold']
     ).distinct().count()
     
-    # Debug: Print to console (will show in Django logs)
-    print(f"DEBUG: Total installments: {all_installments.count()}")
-    print(f"DEBUG: Paid installments: {paid_installments.count()}")
-    print(f"DEBUG: Total income: {total_income}")
-    print(f"DEBUG: Monthly income: {monthly_income}")
-    
     return {
-        'total_income': total_income,
+        'total_income': totals['total_paid'],
         'monthly_income': monthly_income,
-        'pending_payments': pending_payments,
-        'overdue_payments_total': overdue_payments['total'] or 0,
-        'overdue_payments_count': overdue_payments['count'] or 0,
+        'pending_payments': totals['total_pending'],
+        'overdue_payments_total': totals['past_due_total'],
+        'overdue_payments_count': totals['past_due_count'],
         'total_projects': total_projects,
         'active_projects': active_projects,
         'completed_projects': completed_projects,
@@ -647,27 +882,15 @@ def dashboard_view(request):
         due_date__gte=today
     ).select_related('project', 'project__client').order_by('due_date')[:5]
     
-    # Generate monthly income data for chart
-    monthly_income_data = []
-    month_labels = []
-    
-    for i in range(6):
-        month_date = today - timedelta(days=30*i)
-        month_start = month_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_income = PaymentInstallment.objects.filter(
-            status='paid',
-            paid_date__gte=month_start,
-            paid_date__lte=month_end
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        monthly_income_data.append(float(month_income))
-        month_labels.append(month_date.strftime('%b'))
+    # Recurring plan occurrences beyond the materialized horizon aren't rows yet
+    upcoming_payments = list(islice(heapq.merge(
+        upcoming_payments, upcoming_occurrences(start=today), key=attrgetter('due_date')
+    ), 5))
     
-    # Reverse to show oldest to newest
-    monthly_income_data.reverse()
-    month_labels.reverse()
+    # Monthly income data for chart, last six months oldest first
+    monthly = RECEIVABLES.monthly(add_months(today.replace(day=1), -5), today)
+    monthly_income_data = [float(total) for _, total in monthly]
+    month_labels = [month.strftime('%b') for month, _ in monthly]
     
     context = {
         'segment': 'dashboard',
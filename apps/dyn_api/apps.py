@@ -8,3 +8,10 @@ from django.apps import AppConfig
 class DynApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dyn_api'
+
+    def ready(self):
+        from django.conf import settings
+        from cli.h_django_registry import MODEL_REGISTRY
+
+        # Resolve models and build serializers once, off the request path
+        MODEL_REGISTRY.build(getattr(settings, 'DYNAMIC_API', {}))
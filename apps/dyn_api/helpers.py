@@ -3,19 +3,26 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
-import datetime, sys, inspect, importlib
+import datetime, sys, inspect
 
 from functools import wraps
 
 from django.db import models
 from django.http import HttpResponseRedirect, HttpResponse
 
-from rest_framework import serializers
+from cli.h_django_registry import MODEL_REGISTRY
 
 class Utils:
+    @staticmethod
+    def get_entry(config, name: str):
+        entry = MODEL_REGISTRY.lookup(config, name)
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
     @staticmethod
     def get_class(config, name: str) -> models.Model:
-        return Utils.model_name_to_class(config[name])
+        return Utils.get_entry(config, name).model
 
     @staticmethod
     def get_manager(config, name: str) -> models.Manager:
@@ -23,23 +30,16 @@ class Utils:
 
     @staticmethod
     def get_serializer(config, name: str):
-        class Serializer(serializers.ModelSerializer):
-            class Meta:
-                model = Utils.get_class(config, name)
-                fields = '__all__'
-
-        return Serializer
+        return Utils.get_entry(config, name).serializer
 
     @staticmethod
     def model_name_to_class(name: str):
 
-        model_name    = name.split('.')[-1]
-        model_import  = name.replace('.'+model_name, '') 
-
-        module = importlib.import_module(model_import)
-        cls = getattr(module, model_name)
+        entry = MODEL_REGISTRY.entry(name)
+        if entry is None:
+            raise ImportError('Cannot import model ' + name)
 
-        return cls 
+        return entry.model
 
 def check_permission(function):
     @wraps(function)
@@ -4,6 +4,8 @@ Copyright (c) 2019 - present AppSeed.us
 """
 
 from django.http import Http404
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
 
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
@@ -36,6 +38,78 @@ def index(request):
 
 class DynamicAPI(APIView):
 
+    # List mode: GET api/model/?page=2&limit=50&fields=id,name&status=active
+    page_size     = 25
+    max_page_size = 500
+    list_params   = ('page', 'limit', 'fields', 'format')
+
+    # Bulk mode: POST / PATCH / DELETE api/model/ with a list payload
+    max_bulk_size   = 1000
+    bulk_batch_size = 500
+
+    def list(self, request, entry):
+
+        try:
+            page  = int(request.GET.get('page', 1))
+            limit = min(int(request.GET.get('limit', self.page_size)), self.max_page_size)
+            if page < 1 or limit < 1:
+                raise ValueError('Expect positive int')
+        except ValueError as e:
+            return Response(data={
+                'message': 'Input Error = ' + str(e),
+                'success': False
+            }, status=400)
+
+        # Projection: only the requested columns are loaded and serialized
+        fields = [f for f in request.GET.get('fields', '').split(',') if f]
+        unknown = [f for f in fields if f not in entry.db_fields]
+        if unknown:
+            return Response(data={
+                'message': 'Unknown fields: ' + ', '.join(unknown),
+                'success': False
+            }, status=400)
+
+        queryset = entry.model.objects.all()
+        if fields:
+            queryset = queryset.only(*fields)
+
+        # Simple equality filters: ?field=value on concrete fields
+        filters = {}
+        for key, value in request.GET.items():
+            if key in self.list_params:
+                continue
+            if key not in entry.db_fields:
+                return Response(data={
+                    'message': 'Unknown filter: ' + key,
+                    'success': False
+                }, status=400)
+            filters[key] = value
+
+        try:
+            queryset = queryset.filter(**filters)
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+
+            # One extra row tells if there is a next page, no COUNT query
+            offset = (page - 1) * limit
+            rows = list(queryset[offset:offset + limit + 1])
+        except (ValueError, ValidationError) as e:
+            return Response(data={
+                'message': 'Input Error = ' + str(e),
+                'success': False
+            }, status=400)
+
+        has_next = len(rows) > limit
+        serializer = entry.serializer_for(fields)(rows[:limit], many=True)
+
+        return Response(data={
+            'data': serializer.data,
+            'page': page,
+            'limit': limit,
+            'has_next': has_next,
+            'success': True
+            }, status=200)
+
     # READ : GET api/model/id or api/model
     def get(self, request, **kwargs):
 
@@ -60,11 +134,7 @@ class DynamicAPI(APIView):
                 model_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))(instance=thing)
                 output = model_serializer.data
             else:
-                all_things = Utils.get_manager(DYNAMIC_API, kwargs.get('model_name')).all()
-                thing_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))
-                output = []
-                for thing in all_things:
-                    output.append(thing_serializer(instance=thing).data)
+                return self.list(request, Utils.get_entry(DYNAMIC_API, kwargs.get('model_name')))
         except KeyError:
             return Response(data={
                 'message': 'this model is not activated or not exist.',
@@ -84,6 +154,9 @@ class DynamicAPI(APIView):
     #@check_permission
     def post(self, request, **kwargs):
         try:
+            if isinstance(request.data, list):
+                return self.bulk_create(request, Utils.get_entry(DYNAMIC_API, kwargs.get('model_name')))
+
             model_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))(data=request.data)
             if model_serializer.is_valid():
                 model_serializer.save()
@@ -132,19 +205,40 @@ class DynamicAPI(APIView):
             'success': True
             }, status=200)
 
-    # DELETE : DELETE api/model/id/
+    # PATCH : PATCH api/model/id/ or PATCH api/model/ with [{id, ...}, ...]
+    def patch(self, request, **kwargs):
+        if kwargs.get('id') is not None:
+            return self.put(request, **kwargs)
+        try:
+            entry = Utils.get_entry(DYNAMIC_API, kwargs.get('model_name'))
+        except KeyError:
+            return Response(data={
+                'message': 'this model is not activated or not exist.',
+                'success': False
+            }, status=400)
+        return self.bulk_update(request, entry)
+
+    # DELETE : DELETE api/model/id/ or DELETE api/model/ with [id, ...]
     #@check_permission
     def delete(self, request, **kwargs):
         try:
             model_manager = Utils.get_manager(DYNAMIC_API, kwargs.get('model_name'))
             to_delete_id = kwargs.get('id')
-            model_manager.get(id=to_delete_id).delete()
+            if to_delete_id is None:
+                return self.bulk_delete(request, Utils.get_entry(DYNAMIC_API, kwargs.get('model_name')))
+
+            deleted, _ = model_manager.filter(id=to_delete_id).delete()
         except KeyError:
             return Response(data={
                 'message': 'this model is not activated or not exist.',
                 'success': False
             }, status=400)
-        except Utils.get_class(DYNAMIC_API, kwargs.get('model_name')).DoesNotExist as e:
+        except (ValueError, ValidationError) as e:
+            return Response(data={
+                'message': 'Input Error = ' + str(e),
+                'success': False
+            }, status=400)
+        if not deleted:
             return Response(data={
                 'message': 'object with given id not found.',
                 'success': False
@@ -153,3 +247,197 @@ class DynamicAPI(APIView):
             'message': 'Record Deleted.',
             'success': True
         }, status=200)
+
+    # Bulk variants: validate every item first, then write in one transaction.
+    # Any invalid item rejects the whole batch and is reported by its index.
+
+    def bulk_create(self, request, entry):
+        if len(request.data) > self.max_bulk_size:
+            return self.bulk_too_large()
+
+        errors = []
+        objects = []
+        relations = []
+        seen = {}
+        unique_fields = [f.name for f in entry.model._meta.concrete_fields if f.unique and not f.primary_key]
+        for index, item in enumerate(request.data):
+            model_serializer = entry.serializer(data=item)
+            if not model_serializer.is_valid():
+                errors.append({'index': index, **model_serializer.errors})
+                continue
+
+            # The serializer checks uniqueness against the table, not the rest of the batch
+            data = dict(model_serializer.validated_data)
+            duplicates = {}
+            for name in unique_fields:
+                if data.get(name) is None:
+                    continue
+                first = seen.setdefault((name, data[name]), index)
+                if first != index:
+                    duplicates[name] = ['Same value as item ' + str(first) + ' in this batch.']
+            if duplicates:
+                errors.append({'index': index, **duplicates})
+                continue
+
+            relations.append(self.pop_m2m(entry, data))
+            objects.append(entry.model(**data))
+
+        if errors:
+            return Response(data={
+                'errors': errors,
+                'success': False
+            }, status=400)
+
+        try:
+            with transaction.atomic():
+                if any(relations) and not connection.features.can_return_rows_from_bulk_insert:
+                    # M2M rows need the new primary keys
+                    for thing in objects:
+                        thing.save()
+                    created = objects
+                else:
+                    created = entry.model.objects.bulk_create(objects, batch_size=self.bulk_batch_size)
+                self.set_m2m(created, relations)
+        except IntegrityError as e:
+            return self.bulk_integrity_error(e)
+
+        return Response(data={
+            'message': str(len(created)) + ' Records Created.',
+            'ids': [obj.pk for obj in created],
+            'success': True
+        }, status=200)
+
+    def bulk_update(self, request, entry):
+        if not isinstance(request.data, list):
+            return Response(data={
+                'message': 'Input Error = Expect a list of objects with id',
+                'success': False
+            }, status=400)
+        if len(request.data) > self.max_bulk_size:
+            return self.bulk_too_large()
+
+        errors = []
+        ids = []
+        for index, item in enumerate(request.data):
+            if not isinstance(item, dict) or item.get('id') is None:
+                errors.append({'index': index, 'id': ['This field is required.']})
+            else:
+                ids.append(item['id'])
+
+        try:
+            things = entry.model.objects.in_bulk(ids)
+        except (ValueError, ValidationError) as e:
+            return Response(data={
+                'message': 'Input Error = ' + str(e),
+                'success': False
+            }, status=400)
+        things = {str(pk): thing for pk, thing in things.items()}
+
+        objects = []
+        relations = []
+        fields = set()
+        for index, item in enumerate(request.data):
+            if not isinstance(item, dict) or item.get('id') is None:
+                continue
+            thing = things.get(str(item['id']))
+            if thing is None:
+                errors.append({'index': index, 'id': ['object with given id not found.']})
+                continue
+
+            model_serializer = entry.serializer(instance=thing, data=item, partial=True)
+            if not model_serializer.is_valid():
+                errors.append({'index': index, **model_serializer.errors})
+                continue
+
+            data = dict(model_serializer.validated_data)
+            relations.append(self.pop_m2m(entry, data))
+            for attr, value in data.items():
+                setattr(thing, attr, value)
+                fields.add(attr)
+            objects.append(thing)
+
+        if errors:
+            return Response(data={
+                'errors': errors,
+                'success': False
+            }, status=400)
+
+        # auto_now columns are not touched by bulk_update unless listed
+        for field in entry.model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for thing in objects:
+                    setattr(thing, field.attname, field.pre_save(thing, False))
+                fields.add(field.name)
+
+        try:
+            with transaction.atomic():
+                if objects and fields:
+                    entry.model.objects.bulk_update(objects, list(fields), batch_size=self.bulk_batch_size)
+                self.set_m2m(objects, relations)
+        except IntegrityError as e:
+            return self.bulk_integrity_error(e)
+
+        return Response(data={
+            'message': str(len(objects)) + ' Records Updated.',
+            'success': True
+        }, status=200)
+
+    def bulk_delete(self, request, entry):
+        ids = request.data
+        if isinstance(ids, dict):
+            ids = ids.get('ids')
+        if not ids and request.GET.get('ids'):
+            ids = request.GET['ids'].split(',')
+        if not isinstance(ids, list) or not ids:
+            return Response(data={
+                'message': 'Input Error = Expect a list of ids',
+                'success': False
+            }, status=400)
+        if len(ids) > self.max_bulk_size:
+            return self.bulk_too_large()
+
+        try:
+            with transaction.atomic():
+                queryset = entry.model.objects.filter(pk__in=ids)
+                found = {str(pk) for pk in queryset.values_list('pk', flat=True)}
+                missing = [pk for pk in ids if str(pk) not in found]
+                if missing:
+                    return Response(data={
+                        'errors': [{'index': ids.index(pk), 'id': ['object with given id not found.']} for pk in missing],
+                        'success': False
+                    }, status=404)
+                queryset.delete()
+        except (ValueError, ValidationError) as e:
+            return Response(data={
+                'message': 'Input Error = ' + str(e),
+                'success': False
+            }, status=400)
+
+        return Response(data={
+            'message': str(len(found)) + ' Records Deleted.',
+            'success': True
+        }, status=200)
+
+    @staticmethod
+    def pop_m2m(entry, data):
+        # Many-to-many values can't be passed to the model, they are set once rows are saved
+        return {f.name: data.pop(f.name) for f in entry.model._meta.many_to_many if f.name in data}
+
+    @staticmethod
+    def set_m2m(objects, relations):
+        for thing, m2m in zip(objects, relations):
+            for name, values in m2m.items():
+                getattr(thing, name).set(values)
+
+    def bulk_integrity_error(self, error):
+        # Constraints the serializers can't see, e.g. a conflicting concurrent write
+        return Response(data={
+            'errors': [{'non_field_errors': ['Integrity Error = ' + str(error)]}],
+            'success': False
+        }, status=400)
+
+    def bulk_too_large(self):
+        return Response(data={
+            'message': 'Input Error = At most ' + str(self.max_bulk_size) + ' items per request',
+            'success': False
+        }, status=400)
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 class DynDtConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dyn_dt'
+
+    def ready(self):
+        from django.conf import settings
+        from cli.h_django_registry import MODEL_REGISTRY
+
+        # Resolve models and field metadata once, off the request path
+        MODEL_REGISTRY.build(getattr(settings, 'DYNAMIC_DATATB', {}))
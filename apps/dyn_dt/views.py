@@ -82,36 +82,23 @@ def delete_filter(request, model_name, id):
     return redirect(reverse('model_dt', args=[model_name]))
 
 
-def get_model_field_names(model, field_type):
-    """Returns a list of field names based on the given field type."""
-    return [
-        field.name for field in model._meta.get_fields() 
-        if isinstance(field, field_type)
-    ]
+def get_model_entry(aPath):
+    """Returns the cached registry entry for a DYNAMIC_DATATB slug, or None."""
+    if aPath not in settings.DYNAMIC_DATATB.keys():
+        return None
+    return MODEL_REGISTRY.entry(settings.DYNAMIC_DATATB[aPath])
 
 def model_dt(request, aPath):
-    aModelName  = None
-    aModelClass = None
-    choices_dict = {}
+    aModelEntry = get_model_entry(aPath)
 
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
-
-    if not aModelClass:
+    if not aModelEntry:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
-    
-    #db_fields = [field.name for field in aModelClass._meta.get_fields() if not field.is_relation]
-    db_fields = [field.name for field in aModelClass._meta.fields]
-    fk_fields = get_model_fk_values(aModelClass)
-    db_filters = []
-    for f in db_fields:
-        if f not in fk_fields.keys():
-            db_filters.append( f )
-
-    for field in aModelClass._meta.fields:
-        if field.choices:
-            choices_dict[field.name] = field.choices
+
+    aModelClass  = aModelEntry.model
+    db_fields    = aModelEntry.db_fields
+    fk_fields    = aModelEntry.fk_values()
+    db_filters   = aModelEntry.db_filters
+    choices_dict = aModelEntry.choices
 
     field_names = []
     for field_name in db_fields:
@@ -119,11 +106,6 @@ def model_dt(request, aPath):
         if fields.key in db_fields:
             field_names.append(fields)
     
-    model_series = {}
-    for f in db_fields:
-        f_values = list ( aModelClass.objects.values_list( f, flat=True) )
-        model_series[ f ] = ', '.join( str(i) for i in f_values)
-
     # model filter
     filter_string = {}
     filter_instance = ModelFilter.objects.filter(parent=aPath.lower())
@@ -156,11 +138,6 @@ def model_dt(request, aPath):
     
     read_only_fields = ('id', )
 
-    integer_fields = get_model_field_names(aModelClass, models.IntegerField)
-    date_time_fields = get_model_field_names(aModelClass, models.DateTimeField)
-    email_fields = get_model_field_names(aModelClass, models.EmailField)
-    text_fields = get_model_field_names(aModelClass, (models.TextField, models.CharField))
-    
     context = {
         'page_title': 'Dynamic DataTable - ' + aPath.lower().title(),
         'link': aPath,
@@ -172,10 +149,11 @@ def model_dt(request, aPath):
         'filter_instance': filter_instance,
         'read_only_fields': read_only_fields,
 
-        'integer_fields': integer_fields,
-        'date_time_fields': date_time_fields,
-        'email_fields': email_fields,
-        'text_fields': text_fields,
+        'integer_fields': aModelEntry.integer_fields,
+        'date_time_fields': aModelEntry.date_time_fields,
+        'date_fields': aModelEntry.date_fields,
+        'email_fields': aModelEntry.email_fields,
+        'text_fields': aModelEntry.text_fields,
         'fk_fields_keys': list( fk_fields.keys() ),
         'fk_fields': fk_fields ,
         'choices_dict': choices_dict,
@@ -186,18 +164,16 @@ def model_dt(request, aPath):
 
 @login_required(login_url='/accounts/login/')
 def create(request, aPath):
-    aModelClass = None
-
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
+    aModelEntry = get_model_entry(aPath)
 
-    if not aModelClass:
+    if not aModelEntry:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
 
+    aModelClass = aModelEntry.model
+
     if request.method == 'POST':
         data = {}
-        fk_fields = get_model_fk(aModelClass)
+        fk_fields = aModelEntry.fk_fields
 
         for attribute, value in request.POST.items():
             if attribute == 'csrfmiddlewaretoken':
@@ -216,14 +192,12 @@ def create(request, aPath):
 
 @login_required(login_url='/accounts/login/')
 def delete(request, aPath, id):
-    aModelClass = None
+    aModelEntry = get_model_entry(aPath)
 
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
-
-    if not aModelClass:
+    if not aModelEntry:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
+
+    aModelClass = aModelEntry.model
     
     item = aModelClass.objects.get(id=id)
     item.delete()
@@ -232,17 +206,15 @@ def delete(request, aPath, id):
 
 @login_required(login_url='/accounts/login/')
 def update(request, aPath, id):
-    aModelClass = None
+    aModelEntry = get_model_entry(aPath)
 
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
-
-    if not aModelClass:
+    if not aModelEntry:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
 
+    aModelClass = aModelEntry.model
+
     item = aModelClass.objects.get(id=id)
-    fk_fields = get_model_fk(aModelClass)
+    fk_fields = aModelEntry.fk_fields
 
     if request.method == 'POST':
         for attribute, value in request.POST.items():
@@ -267,17 +239,13 @@ def update(request, aPath, id):
 # Export as CSV
 class ExportCSVView(View):
     def get(self, request, aPath):
-        aModelName  = None
-        aModelClass = None
+        aModelEntry = get_model_entry(aPath)
 
-        if aPath in settings.DYNAMIC_DATATB.keys():
-            aModelName  = settings.DYNAMIC_DATATB[aPath]
-            aModelClass = name_to_class(aModelName)
-
-        if not aModelClass:
+        if not aModelEntry:
             return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
-        
-        db_field_names = [field.name for field in aModelClass._meta.get_fields()]
+
+        aModelClass    = aModelEntry.model
+        db_field_names = aModelEntry.all_fields
         fields = []
         show_fields = HideShowFilter.objects.filter(value=False, parent=aPath.lower())
         
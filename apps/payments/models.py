@@ -3,6 +3,25 @@ from apps.projects.models import Project
 from apps.clients.models import Client
 
 
+class PaymentQuerySet(models.QuerySet):
+    def with_overdue(self, today=None):
+        """Annotate is_overdue in SQL, same rule as Payment.is_overdue"""
+        from django.utils import timezone
+        today = today or timezone.now().date()
+        return self.annotate(is_overdue=models.Case(
+            models.When(~models.Q(status='completed') & models.Q(due_date__lt=today), then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+    
+    def with_remaining(self):
+        """Annotate remaining_amount (amount - amount_paid) in SQL"""
+        return self.annotate(remaining_amount=models.ExpressionWrapper(
+            models.F('amount') - models.F('amount_paid'),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ))
+
+
 class Payment(models.Model):
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -35,20 +54,47 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = PaymentQuerySet.as_manager()
+    
     def __str__(self):
         return f"Payment {self.invoice_number} - {self.project.title} - {self.amount}"
     
+    # Both properties return the PaymentQuerySet annotation when the row has one
     @property
     def remaining_amount(self):
+        if '_remaining_amount' in self.__dict__:
+            return self._remaining_amount
         return self.amount - self.amount_paid
     
+    @remaining_amount.setter
+    def remaining_amount(self, value):
+        self._remaining_amount = value
+    
     @property
     def is_overdue(self):
+        if '_is_overdue' in self.__dict__:
+            return self._is_overdue
         from django.utils import timezone
         return self.due_date < timezone.now().date() and self.status != 'completed'
     
+    @is_overdue.setter
+    def is_overdue(self, value):
+        self._is_overdue = value
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Annotated values describe the row as loaded, recompute from the saved fields
+        self.__dict__.pop('_remaining_amount', None)
+        self.__dict__.pop('_is_overdue', None)
+    
     class Meta:
         ordering = ['-payment_date']
+        indexes = [
+            # Keyset pagination: ORDER BY payment_date DESC, id DESC
+            models.Index(fields=['payment_date', 'id']),
+            # Delta sync: ?updated_since=
+            models.Index(fields=['updated_at']),
+        ]
 
 
 class Invoice(models.Model):
@@ -64,6 +110,12 @@ class Invoice(models.Model):
     def __str__(self):
         return f"Invoice {self.invoice_number}"
     
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY issue_date DESC, id DESC
+            models.Index(fields=['issue_date', 'id']),
+        ]
+    
     @property
     def grand_total(self):
         return self.total_amount + self.tax_amount - self.discount_amount
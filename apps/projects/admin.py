@@ -4,7 +4,7 @@ from .models import Project, ProjectRequirement
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    list_display = ['title', 'client', 'status', 'priority', 'assigned_to', 'start_date', 'due_date', 'budget']
+    list_display = ['title', 'client', 'status', 'priority', 'assigned_to', 'start_date', 'due_date', 'budget', 'requirement_progress']
     list_filter = ['status', 'priority', 'client', 'assigned_to', 'start_date']
     search_fields = ['title', 'description', 'client__name']
     date_hierarchy = 'start_date'
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_progress'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at', 'id'], name='projects_pr_created_3ed563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectrequirement',
+            index=models.Index(fields=['created_at', 'id'], name='projects_pr_created_abfb14_idx'),
+        ),
+    ]
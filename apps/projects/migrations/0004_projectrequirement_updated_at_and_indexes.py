@@ -0,0 +1,26 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_created_at_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectrequirement',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at'], name='projects_pr_updated_d6acc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectrequirement',
+            index=models.Index(fields=['updated_at'], name='projects_pr_updated_3d94f7_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.9 on 2026-10-19 16:49
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, NullIf
+
+
+def count_requirements(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectRequirement = apps.get_model('projects', 'ProjectRequirement')
+
+    def count(condition=Q()):
+        return Coalesce(Subquery(
+            ProjectRequirement.objects.filter(condition, project=OuterRef('pk'))
+            .order_by().values('project').annotate(count=Count('pk')).values('count')
+        ), Value(0))
+
+    Project.objects.update(requirements_total=count(), requirements_done=count(Q(is_completed=True)))
+    Project.objects.update(requirement_progress=Coalesce(
+        F('requirements_done') * 100 / NullIf(F('requirements_total'), 0), Value(0), output_field=IntegerField()
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_projectrequirement_updated_at_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='requirement_progress',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Completed requirements, percent'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='requirements_done',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='requirements_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['requirement_progress'], name='projects_pr_require_17a657_idx'),
+        ),
+        migrations.RunPython(count_requirements, migrations.RunPython.noop),
+    ]
@@ -29,16 +29,41 @@ class Project(models.Model):
     due_date = models.DateField()
     budget = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     progress = models.IntegerField(default=0, help_text="Project completion percentage (0-100)")
+    # Maintained by the ProjectRequirement signals in apps.crm.signals, never edited directly
+    requirements_total = models.PositiveIntegerField(default=0, editable=False)
+    requirements_done = models.PositiveIntegerField(default=0, editable=False)
+    requirement_progress = models.PositiveSmallIntegerField(default=0, editable=False,
+                                                            help_text="Completed requirements, percent")
     requirements = models.TextField(blank=True)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    COUNTER_FIELDS = ('requirements_total', 'requirements_done', 'requirement_progress')
+    
     def __str__(self):
         return f"{self.title} - {self.client.name}"
     
+    def save(self, *args, **kwargs):
+        # The counters are updated in SQL while this instance may be stale;
+        # a plain save() of an existing row must not write them back
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['created_at', 'id']),
+            # Delta sync: ?updated_since=
+            models.Index(fields=['updated_at']),
+            # Sorting and filtering lists by real progress
+            models.Index(fields=['requirement_progress']),
+        ]
 
 
 class ProjectRequirement(models.Model):
@@ -47,6 +72,15 @@ class ProjectRequirement(models.Model):
     description = models.TextField()
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.title} - {self.project.title}"
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['created_at', 'id']),
+            # Delta sync: ?updated_since=
+            models.Index(fields=['updated_at']),
+        ]
@@ -15,5 +15,6 @@ from .h_django_deps             import *
 from .h_django_env              import *
 from .h_django_urls             import *
 from .h_django_settings         import *
+from .h_django_registry         import *
 from .h_ai_claude               import *
 
@@ -5,6 +5,8 @@ Copyright (c) App-Generator.dev | AppSeed.us
 
 import os, ast, astor, importlib
 
+from functools import lru_cache
+
 from .common   import *
 from .h_files  import *
 from .h_util   import *
@@ -12,18 +14,24 @@ from .h_util   import *
 def name_to_class(name: str):
 
     try:
-        # Process the path 
-        cls_name    = name.split('.')[-1]             # Extract Class Name
-        cls_import  = name.replace('.'+cls_name, '')  # Extract Import path
-
-        module = importlib.import_module(cls_import)  # Here is expected a valid package 
-
-        # If all good, a class is returned 
-        return getattr(module, cls_name)               
+        return _import_class( name )
     except:
 
-        # Nothing found, bozzo input
+        # Nothing found, bozzo input (not cached, it may resolve later)
         return None 
+
+# Only successful lookups are memoized, lru_cache does not store raised errors
+@lru_cache(maxsize=None)
+def _import_class(name: str):
+
+    # Process the path 
+    cls_name    = name.split('.')[-1]             # Extract Class Name
+    cls_import  = name.replace('.'+cls_name, '')  # Extract Import path
+
+    module = importlib.import_module(cls_import)  # Here is expected a valid package 
+
+    # If all good, a class is returned 
+    return getattr(module, cls_name)               
     
 def h_model_to_csv(aModelClassImport, aNbrRows=COMMON.ROWS_MAX):
 
@@ -0,0 +1,131 @@
+# -*- encoding: utf-8 -*-
+"""
+Copyright (c) App-Generator.dev | AppSeed.us
+"""
+
+import threading
+
+from django.db import models
+
+from .common        import *
+from .h_code_parser import *
+
+# Field subsets per model whose serializer class is kept by ModelEntry.serializer_for
+PROJECTED_SERIALIZERS_MAX = 64
+
+class ModelEntry:
+    """
+    Resolved model class plus everything the dynamic views derive from it:
+    the DRF serializer class and the field metadata used by the datatables.
+    Built once per import path and shared by all slugs that point to it.
+    """
+
+    def __init__(self, aImportPath, aModelClass):
+        self.import_path = aImportPath
+        self.model       = aModelClass
+
+        meta = aModelClass._meta
+
+        self.db_fields   = [ f.name for f in meta.fields ]
+        self.all_fields  = [ f.name for f in meta.get_fields() ]
+
+        # FK name -> related model import path
+        self.fk_fields   = {}
+        for f in meta.fields:
+            if type( f ) is models.ForeignKey:
+                self.fk_fields[ f.name ] = f.related_model.__module__ + '.' + f.related_model.__name__
+
+        self.db_filters  = [ f for f in self.db_fields if f not in self.fk_fields ]
+
+        self.choices     = {}
+        for f in meta.fields:
+            if f.choices:
+                self.choices[ f.name ] = f.choices
+
+        self.integer_fields   = self.field_names( models.IntegerField )
+        self.date_time_fields = self.field_names( models.DateTimeField )
+        self.date_fields      = self.field_names( models.DateField )
+        self.email_fields     = self.field_names( models.EmailField )
+        self.text_fields      = self.field_names( (models.TextField, models.CharField) )
+
+        self.serializer  = self._build_serializer()
+        self._projected  = {}  # tuple of field names -> serializer class
+
+    def field_names(self, aFieldType):
+        return [ f.name for f in self.model._meta.get_fields() if isinstance( f, aFieldType ) ]
+
+    def fk_values(self):
+        # Related rows change at runtime, only the FK map is cached
+        retVal = {}
+        for name, cls_path in self.fk_fields.items():
+            retVal[ name ] = list( name_to_class( cls_path ).objects.all() )
+        return retVal
+
+    def serializer_for(self, aFields=None):
+        # Serializer restricted to a subset of fields, cached per subset
+        if not aFields:
+            return self.serializer
+
+        # Same subset in any order or with repeats -> one key, in model field order
+        wanted = set( aFields )
+        key    = tuple( f for f in self.db_fields if f in wanted )
+        if not key:
+            return self.serializer
+
+        serializer = self._projected.get( key )
+        if not serializer:
+            serializer = self._build_serializer( list( key ) )
+            # Bounded, a wide model has too many subsets to keep them all
+            if len( self._projected ) < PROJECTED_SERIALIZERS_MAX:
+                self._projected[ key ] = serializer
+        return serializer
+
+    def _build_serializer(self, aFields='__all__'):
+        from rest_framework import serializers
+
+        meta = type( 'Meta', (), { 'model': self.model, 'fields': aFields } )
+        return type( self.model.__name__ + 'Serializer', (serializers.ModelSerializer,), { 'Meta': meta, '__module__': __name__ } )
+
+class ModelRegistry:
+    """
+    Process wide cache of ModelEntry objects.
+    Populated from DYNAMIC_API / DYNAMIC_DATATB when the apps are ready,
+    entries missing at that time are resolved on first use.
+    """
+
+    def __init__(self):
+        self._entries = {}  # import path -> ModelEntry
+        self._lock    = threading.Lock()
+
+    def build(self, aConfig):
+        for slug, import_path in ( aConfig or {} ).items():
+            entry = self.entry( import_path )
+            if not entry:
+                print( f" > ERR getting class for [{slug}] -> [{import_path}]" )
+        return self
+
+    def entry(self, aImportPath):
+        entry = self._entries.get( aImportPath )
+        if entry:
+            return entry
+
+        aModelClass = name_to_class( aImportPath )
+        if not aModelClass:
+            return None
+
+        with self._lock:
+            entry = self._entries.get( aImportPath )
+            if not entry:
+                entry = ModelEntry( aImportPath, aModelClass )
+                self._entries[ aImportPath ] = entry
+        return entry
+
+    def lookup(self, aConfig, aSlug):
+        # KeyError for unknown slugs, same contract as a plain dict lookup
+        return self.entry( aConfig[ aSlug ] )
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+MODEL_REGISTRY = ModelRegistry()
@@ -257,8 +257,8 @@ EMAIL_TIMEOUT = 20  # seconds
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.api.authentication.CachedSessionAuthentication',
+        'apps.api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -268,9 +268,42 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.api.renderers.FastJSONRenderer',  # orjson when installed, stdlib otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'apps.api.pagination.CRMPagination',  # ?pagination=cursor for keyset paging
     'PAGE_SIZE': 20,
 }
 
+# Per-user API response cache (apps.api.cache). With several workers point
+# CACHES at Redis or Memcached so invalidations reach every process.
+API_CACHE_ALIAS   = os.getenv('API_CACHE_ALIAS'  , 'default')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+
+# Seconds a token/session -> user lookup is reused (apps.api.authentication)
+API_AUTH_CACHE_TTL = int(os.getenv('API_AUTH_CACHE_TTL', 30))
+
+# Days ahead materialize_recurring_payments stores plan occurrences (apps.crm.recurring)
+RECURRING_PAYMENT_HORIZON_DAYS = int(os.getenv('RECURRING_PAYMENT_HORIZON_DAYS', 90))
+
+# Per-worker installment snapshot (apps.crm.receivables): seconds between
+# change-cursor checks, and between full reloads
+RECEIVABLES_CACHE_REFRESH_SECONDS = int(os.getenv('RECEIVABLES_CACHE_REFRESH_SECONDS', 5))
+RECEIVABLES_CACHE_RELOAD_SECONDS  = int(os.getenv('RECEIVABLES_CACHE_RELOAD_SECONDS' , 3600))
+
+# Seconds a computed AR aging report is reused (apps.crm.aging); writes
+# to installments, payments or projects invalidate it sooner
+AR_AGING_CACHE_TIMEOUT = int(os.getenv('AR_AGING_CACHE_TIMEOUT', 600))
+
+# Further years of revenue at a client's current rate counted into its
+# lifetime value (apps.crm.segments)
+CLIENT_LIFETIME_YEARS = int(os.getenv('CLIENT_LIFETIME_YEARS', 3))
+
 
 ########################################